@@ -0,0 +1,20 @@
+import os
+import sys
+from pathlib import Path
+
+APP_NAME = 'register-gui'
+
+
+def user_data_dir():
+    """本程序的用户数据目录，不随当前工作目录变化
+
+    Windows 为 %LOCALAPPDATA%，macOS 为 ~/Library/Application Support，其他
+    平台为 $XDG_DATA_HOME 或 ~/.local/share，其下再加 APP_NAME。
+    """
+    if sys.platform == 'win32':
+        base = Path(os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local')
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Application Support'
+    else:
+        base = Path(os.environ.get('XDG_DATA_HOME') or Path.home() / '.local' / 'share')
+    return base / APP_NAME
@@ -0,0 +1,75 @@
+import asyncio
+
+from .gui_api import GuiApi, column_writes, rows_to_columns
+from .metrics import instrumented
+
+
+class AsyncGuiApi:
+    """GuiApi 的 asyncio 版本
+
+    接口与 GuiApi 相同，但都是协程：等待设备时只占用一个协程而不是一个
+    线程，同一个事件循环可以同时挂起成千上万个 lane 事务。取消通过
+    asyncio 的任务取消实现（抛出 CancelledError），不使用 cancel_token。
+
+    耗时参数沿用 GuiApi 的设置。
+    """
+
+    @classmethod
+    @instrumented('AsyncGuiApi')
+    async def getDriver(cls, side, lane):
+        await asyncio.sleep(GuiApi.transaction_delay())
+        return True, GuiApi._read_driver(side, lane)
+
+    @classmethod
+    @instrumented('AsyncGuiApi')
+    async def setDriver(cls, side, lane, data):
+        for key, value in data.items():
+            await cls._write_register(side, lane, key, value)
+        return True, data
+
+    @classmethod
+    @instrumented('AsyncGuiApi')
+    async def getAfe(cls, side, lane, dir):
+        await asyncio.sleep(GuiApi.transaction_delay())
+        return True, GuiApi._read_afe(side, lane, dir)
+
+    @classmethod
+    @instrumented('AsyncGuiApi')
+    async def setAfe(cls, side, lane, dir, data):
+        for key, value in data.items():
+            await cls._write_register(side, lane, key, value)
+        return True, data
+
+    @classmethod
+    @instrumented('AsyncGuiApi')
+    async def getDriverLanes(cls, side, lanes):
+        await asyncio.sleep(GuiApi.transaction_delay())
+        return True, rows_to_columns(
+            lanes, [GuiApi._read_driver(side, lane) for lane in lanes])
+
+    @classmethod
+    @instrumented('AsyncGuiApi')
+    async def setDriverLanes(cls, side, lanes, data):
+        await asyncio.sleep(GuiApi.transaction_delay())
+        for lane, key, value in column_writes(lanes, data):
+            await cls._write_register(side, lane, key, value)
+        return True, dict(data, lane=list(lanes))
+
+    @classmethod
+    @instrumented('AsyncGuiApi')
+    async def getAfeLanes(cls, side, lanes, dir):
+        await asyncio.sleep(GuiApi.transaction_delay())
+        return True, rows_to_columns(
+            lanes, [GuiApi._read_afe(side, lane, dir) for lane in lanes])
+
+    @classmethod
+    @instrumented('AsyncGuiApi')
+    async def setAfeLanes(cls, side, lanes, dir, data):
+        await asyncio.sleep(GuiApi.transaction_delay())
+        for lane, key, value in column_writes(lanes, data):
+            await cls._write_register(side, lane, key, value)
+        return True, dict(data, lane=list(lanes))
+
+    @classmethod
+    async def _write_register(cls, side, lane, key, value):
+        await asyncio.sleep(GuiApi.REGISTER_WRITE_DELAY)
@@ -0,0 +1,95 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class OperationCancelled(Exception):
+    """操作已被取消"""
+
+
+class CancelToken:
+    """协作式取消标记
+
+    由发起操作的一方调用 cancel()，执行操作的线程在事务之间调用
+    raise_if_cancelled()（或通过模块级的 check()/sleep()）检查并尽快退出。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._conditions = []  # 取消时需要唤醒的 threading.Condition
+
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            conditions = list(self._conditions)
+        for condition in conditions:
+            with condition:
+                condition.notify_all()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled()
+
+    def wait(self, timeout):
+        """最多等待 timeout 秒，期间被取消则立即返回 True"""
+        return self._event.wait(timeout)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def use_token(token):
+    """在当前线程中把 token 设为当前取消标记"""
+    previous = getattr(_local, 'token', None)
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def current_token():
+    return getattr(_local, 'token', None)
+
+
+def check():
+    """当前线程的操作被取消时抛出 OperationCancelled"""
+    token = current_token()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def sleep(seconds):
+    """可被当前取消标记打断的 time.sleep"""
+    token = current_token()
+    if token is None:
+        time.sleep(seconds)
+        return
+    token.raise_if_cancelled()
+    if token.wait(seconds):
+        raise OperationCancelled()
+
+
+@contextmanager
+def wake_on_cancel(condition):
+    """当前取消标记被取消时唤醒在 condition 上等待的线程
+
+    需要在检查 check() 之前进入，等待方被唤醒后再次 check() 即可退出。
+    """
+    token = current_token()
+    if token is None:
+        yield
+        return
+    with token._lock:
+        token._conditions.append(condition)
+    try:
+        yield
+    finally:
+        with token._lock:
+            token._conditions.remove(condition)
@@ -0,0 +1,171 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from . import cancel_token
+from .gui_api import GuiApi, use_connection
+from .metrics import metrics
+from .register_cache import RegisterCache
+from .snapshot_store import snapshot_store
+
+DEFAULT_DEVICE = 'default'
+
+
+class DeviceSession:
+    """一个设备的持久会话
+
+    - 第一次事务时建立连接，之后所有事务复用这条连接
+    - 连接空闲超过 HEALTH_CHECK_INTERVAL 后，下次使用前先做健康检查，
+      检查失败或事务中出现 ConnectionError 时重新建立连接
+    - 同一设备同时进行的事务数不超过 max_transactions
+
+    对外提供与 GuiApi 相同的接口；cache 为该设备专用的 RegisterCache。
+    读到的值同时记入 snapshot_store。
+    """
+    MAX_TRANSACTIONS = 4
+    HEALTH_CHECK_INTERVAL = 5.0
+
+    def __init__(self, device, api=GuiApi, max_transactions=None):
+        self.device = device
+        self.api = api
+        self.max_transactions = max_transactions or self.MAX_TRANSACTIONS
+        self.cache = RegisterCache(api=self)
+        self._free_slots = self.max_transactions
+        self._slot_released = threading.Condition()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._last_used = 0.0
+        self.connect_count = 0
+
+    @contextmanager
+    def transaction(self):
+        """占用一个事务名额，并在当前线程绑定该设备的连接"""
+        # 等待时间计入 DeviceSession.wait
+        with metrics.timed('DeviceSession.wait', self.device):
+            self._acquire_slot()
+        try:
+            connection = self._acquire_connection()
+            try:
+                with use_connection(connection):
+                    yield connection
+            except ConnectionError:
+                self._drop(connection)
+                raise
+            finally:
+                self._last_used = time.monotonic()
+        finally:
+            self._release_slot()
+
+    def _acquire_slot(self):
+        """阻塞等待一个事务名额，当前操作被取消时立即抛出 OperationCancelled"""
+        with self._slot_released, cancel_token.wake_on_cancel(self._slot_released):
+            try:
+                while self._free_slots == 0:
+                    cancel_token.check()
+                    self._slot_released.wait()
+            except cancel_token.OperationCancelled:
+                # 可能恰好被 release 选中唤醒，把通知转给下一个等待者
+                if self._free_slots:
+                    self._slot_released.notify()
+                raise
+            self._free_slots -= 1
+
+    def _release_slot(self):
+        with self._slot_released:
+            self._free_slots += 1
+            self._slot_released.notify()
+
+    def healthy(self):
+        with self._lock:
+            return self._connection is not None and self._connection.ping()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def getDriver(self, side, lane):
+        return self._call('getDriver', side, lane)
+
+    def setDriver(self, side, lane, data):
+        return self._call('setDriver', side, lane, data)
+
+    def getAfe(self, side, lane, dir):
+        return self._call('getAfe', side, lane, dir)
+
+    def setAfe(self, side, lane, dir, data):
+        return self._call('setAfe', side, lane, dir, data)
+
+    def getDriverLanes(self, side, lanes):
+        return self._call('getDriverLanes', side, lanes)
+
+    def setDriverLanes(self, side, lanes, data):
+        return self._call('setDriverLanes', side, lanes, data)
+
+    def getAfeLanes(self, side, lanes, dir):
+        return self._call('getAfeLanes', side, lanes, dir)
+
+    def setAfeLanes(self, side, lanes, dir, data):
+        return self._call('setAfeLanes', side, lanes, dir, data)
+
+    def _call(self, method, *args):
+        with self.transaction():
+            result = getattr(self.api, method)(*args)
+        # 所有设备读数都记入快照存储
+        snapshot_store.capture(self.device, method, args, result)
+        return result
+
+    def _acquire_connection(self):
+        with self._lock:
+            connection = self._connection
+            if connection is not None and \
+                    time.monotonic() - self._last_used > self.HEALTH_CHECK_INTERVAL:
+                try:
+                    alive = connection.ping()
+                except ConnectionError:
+                    alive = False
+                if not alive:
+                    connection.close()
+                    connection = self._connection = None
+
+            if connection is None:
+                connection = self._connection = self.api.open_connection(self.device)
+                self.connect_count += 1
+            return connection
+
+    def _drop(self, connection):
+        with self._lock:
+            if self._connection is connection:
+                connection.close()
+                self._connection = None
+
+
+class SessionPool:
+    """按设备名管理 DeviceSession，同一设备总是返回同一个会话"""
+
+    def __init__(self, api=GuiApi, max_transactions=None):
+        self.api = api
+        self.max_transactions = max_transactions
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, device=None):
+        device = device or DEFAULT_DEVICE
+        with self._lock:
+            session = self._sessions.get(device)
+            if session is None:
+                session = DeviceSession(device, self.api, self.max_transactions)
+                self._sessions[device] = session
+            return session
+
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions.values())
+
+    def close_all(self):
+        for session in self.sessions():
+            session.close()
+
+
+session_pool = SessionPool()
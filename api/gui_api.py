@@ -1,13 +1,203 @@
-import time
+import functools
 import random
+import threading
+from contextlib import contextmanager
+
+from . import cancel_token
+from .metrics import instrumented, metrics
+
+_local = threading.local()
+
+
+def columns_to_rows(columns):
+    """将列式结果 {'lane': [...], key: [...]} 拆分为 [(lane, {key: value})]"""
+    lanes = columns.get('lane', [])
+    keys = [key for key in columns if key != 'lane']
+    return [(lane, {key: columns[key][i] for key in keys})
+            for i, lane in enumerate(lanes)]
+
+
+def rows_to_columns(lanes, rows):
+    """将按 lane 排列的数据字典合并为列式结果，缺失的值以 None 补齐"""
+    columns = {'lane': list(lanes)}
+    for i, row in enumerate(rows):
+        for key, value in row.items():
+            columns.setdefault(key, [None] * len(rows))[i] = value
+    return columns
+
+
+def column_writes(lanes, columns):
+    """列式写入数据 -> [(lane, key, value)]，值为 None 的属性跳过"""
+    return [(lane, key, values[i])
+            for key, values in columns.items() if key != 'lane'
+            for i, lane in enumerate(lanes) if values[i] is not None]
+
+
+class GuiConnection:
+    """到设备的一条连接（模拟）"""
+
+    def __init__(self, device):
+        self.device = device
+        self.closed = False
+
+    def ping(self):
+        """健康检查，连接可用时返回 True"""
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+@contextmanager
+def use_connection(connection):
+    """在当前线程绑定连接，期间的 GuiApi 调用都复用这条连接"""
+    previous = getattr(_local, 'connection', None)
+    _local.connection = connection
+    try:
+        yield connection
+    finally:
+        _local.connection = previous
+
+
+def current_connection():
+    return getattr(_local, 'connection', None)
+
+
+def _transaction(func):
+    """没有绑定连接时，为这次调用临时建立并关闭一条连接"""
+    @functools.wraps(func)
+    def wrapper(cls, *args, **kwargs):
+        if current_connection() is not None:
+            return func(cls, *args, **kwargs)
+        with use_connection(cls.open_connection(None)) as connection:
+            try:
+                return func(cls, *args, **kwargs)
+            finally:
+                connection.close()
+    return wrapper
 
 
 class GuiApi:
+    """设备访问接口
+
+    单 lane 接口（getDriver/setDriver/getAfe/setAfe）每次调用都是一次完整的
+    设备事务；*Lanes 批量接口在一次事务中处理多个 lane，并返回列式结果：
+    {'lane': [lane0, lane1, ...], key: [value0, value1, ...], ...}
+
+    set 接口只写入 data 中给出的属性，每个属性是一次独立的寄存器写操作，
+    返回实际写入的属性。
+
+    每次事务开始前检查当前线程的取消标记（见 cancel_token），被取消时
+    抛出 OperationCancelled。
+
+    当前线程绑定了连接（见 use_connection）时在该连接上执行，否则每次调用
+    临时建立并关闭一条连接。
+    """
+    # 单个寄存器写操作的耗时
+    REGISTER_WRITE_DELAY = 0.25
+    # 建立连接的耗时
+    CONNECT_DELAY = 0.2
+    # 一次事务往返的耗时，实际耗时在 ±TRANSACTION_JITTER 范围内随机波动
+    TRANSACTION_DELAY = 1.0
+    TRANSACTION_JITTER = 0.0
+
+    @classmethod
+    def transaction_delay(cls):
+        jitter = cls.TRANSACTION_JITTER
+        return max(0.0, cls.TRANSACTION_DELAY + (random.uniform(-jitter, jitter) if jitter else 0.0))
+
+    @classmethod
+    def open_connection(cls, device):
+        with metrics.timed('GuiApi.open_connection', device):
+            cancel_token.sleep(cls.CONNECT_DELAY)
+            return GuiConnection(device)
+
     @classmethod
+    @_transaction
+    @instrumented('GuiApi')
     def getDriver(cls, side, lane):
-        # 添加1秒延迟
-        time.sleep(1)
+        cancel_token.sleep(cls.transaction_delay())
+
+        return True, cls._read_driver(side, lane)
+
+    @classmethod
+    @_transaction
+    @instrumented('GuiApi')
+    def setDriver(cls, side, lane, data):
+        for key, value in data.items():
+            cls._write_register(side, lane, key, value)
 
+        return True, data
+
+    @classmethod
+    @_transaction
+    @instrumented('GuiApi')
+    def getAfe(cls, side, lane, dir):
+        cancel_token.sleep(cls.transaction_delay())
+
+        return True, cls._read_afe(side, lane, dir)
+
+    @classmethod
+    @_transaction
+    @instrumented('GuiApi')
+    def setAfe(cls, side, lane, dir, data):
+        for key, value in data.items():
+            cls._write_register(side, lane, key, value)
+
+        return True, data
+
+    @classmethod
+    @_transaction
+    @instrumented('GuiApi')
+    def getDriverLanes(cls, side, lanes):
+        """一次事务读取多个 lane 的 driver 属性，返回列式结果"""
+        # 一次往返的固定开销
+        cancel_token.sleep(cls.transaction_delay())
+
+        return True, rows_to_columns(
+            lanes, [cls._read_driver(side, lane) for lane in lanes])
+
+    @classmethod
+    @_transaction
+    @instrumented('GuiApi')
+    def setDriverLanes(cls, side, lanes, data):
+        """一次事务写入多个 lane 的 driver 属性
+
+        data 为与 lanes 对齐的列式数据，值为 None 表示该 lane 不写入此属性。
+        """
+        cancel_token.sleep(cls.transaction_delay())
+        for lane, key, value in column_writes(lanes, data):
+            cls._write_register(side, lane, key, value)
+
+        return True, dict(data, lane=list(lanes))
+
+    @classmethod
+    @_transaction
+    @instrumented('GuiApi')
+    def getAfeLanes(cls, side, lanes, dir):
+        """一次事务读取多个 lane 的 AFE 属性，返回列式结果"""
+        cancel_token.sleep(cls.transaction_delay())
+
+        return True, rows_to_columns(
+            lanes, [cls._read_afe(side, lane, dir) for lane in lanes])
+
+    @classmethod
+    @_transaction
+    @instrumented('GuiApi')
+    def setAfeLanes(cls, side, lanes, dir, data):
+        """一次事务写入多个 lane 的 AFE 属性，data 的格式同 setDriverLanes"""
+        cancel_token.sleep(cls.transaction_delay())
+        for lane, key, value in column_writes(lanes, data):
+            cls._write_register(side, lane, key, value)
+
+        return True, dict(data, lane=list(lanes))
+
+    @classmethod
+    def _write_register(cls, side, lane, key, value):
+        cancel_token.sleep(cls.REGISTER_WRITE_DELAY)
+
+    @staticmethod
+    def _read_driver(side, lane):
         values = {}
         values['driver_mode'] = lane
         values['prop_1'] = random.randint(0, 5)
@@ -23,20 +213,10 @@ class GuiApi:
         values['prop_10'] = random.randint(0, 10)
         values['prop_11'] = random.randint(0, 10)
         values['prop_12'] = random.randint(0, 10)
-        return True, values
-
-    @classmethod
-    def setDriver(cls, side, lane, data):
-        # 添加1秒延迟
-        time.sleep(1)
-
-        return True, data
-
-    @classmethod
-    def getAfe(cls, side, lane, dir):
-        # 添加1秒延迟
-        time.sleep(1)
+        return values
 
+    @staticmethod
+    def _read_afe(side, lane, dir):
         values = {}
         values['afe_mode'] = random.randint(0, 2)
         values['afe_1'] = random.randint(0, 5)
@@ -47,11 +227,4 @@ class GuiApi:
         values['afe_6'] = random.randint(0, 2)
         values['afe_77'] = random.randint(0, 2)
         values['afe_8'] = random.randint(0, 2)
-        return True, values
-
-    @classmethod
-    def setAfe(cls, side, lane, dir, data):
-        # 添加1秒延迟
-        time.sleep(1)
-
-        return True, data
+        return values
@@ -0,0 +1,192 @@
+import asyncio
+import bisect
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from .cancel_token import OperationCancelled
+
+# 取消（包括协程被取消）不计入统计
+_CANCELLED = (OperationCancelled, asyncio.CancelledError)
+
+
+class _Timing:
+    ok = True
+
+
+class MethodStats:
+    """单个方法的累计统计：直方图计数 + 最近耗时样本（用于分位数）"""
+
+    def __init__(self, buckets, reservoir_size):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # 最后一个为 +Inf
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        # (结束时间, 耗时)，只保留最近的样本
+        self.recent = deque(maxlen=reservoir_size)
+
+    def add(self, duration, end, ok):
+        self.bucket_counts[bisect.bisect_left(self.buckets, duration)] += 1
+        self.count += 1
+        self.total += duration
+        if not ok:
+            self.errors += 1
+        self.recent.append((end, duration))
+
+
+class Metrics:
+    """设备事务的耗时统计
+
+    每条记录包含 method、side、lane、开始/结束时间和是否成功。按 method
+    聚合为：次数、错误率、累计直方图（Prometheus 格式导出），以及基于
+    最近样本计算的 p50/p95/p99 和最近 THROUGHPUT_WINDOW 秒内的吞吐量。
+
+    listeners 中的回调会收到每一条原始记录（在记录所在的线程中调用）。
+    """
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+               1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    RESERVOIR_SIZE = 2048
+    THROUGHPUT_WINDOW = 10.0
+
+    def __init__(self, buckets=None, reservoir_size=None):
+        self.buckets = tuple(buckets or self.BUCKETS)
+        self.reservoir_size = reservoir_size or self.RESERVOIR_SIZE
+        self.enabled = True
+        self.listeners = []
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, method, side, lane, start, end, ok=True):
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stats.get(method)
+            if stats is None:
+                stats = self._stats[method] = MethodStats(self.buckets, self.reservoir_size)
+            stats.add(end - start, end, ok)
+        for listener in self.listeners:
+            listener(method, side, lane, start, end, ok)
+
+    @contextmanager
+    def timed(self, method, side=None, lane=None):
+        """记录 with 块的耗时
+
+        抛出异常记为失败，取消（OperationCancelled/asyncio.CancelledError）
+        不记录；也可以把 yield 出的对象的 ok 置为 False 来标记失败（如接口
+        返回 ret=False）。
+        """
+        timing = _Timing()
+        start = time.monotonic()
+        # 不能用 sys.exc_info() 判断：生成器里能看到调用方正在处理的异常
+        cancelled = False
+        try:
+            yield timing
+        except _CANCELLED:
+            cancelled = True
+            raise
+        except BaseException:
+            timing.ok = False
+            raise
+        finally:
+            if not cancelled:
+                self.record(method, side, lane, start, time.monotonic(), timing.ok)
+
+    def snapshot(self):
+        """按 method 返回聚合结果 {method: {...}}，耗时单位为秒"""
+        now = time.monotonic()
+        with self._lock:
+            items = [(method, stats.count, stats.errors, stats.total, list(stats.recent))
+                     for method, stats in self._stats.items()]
+
+        result = {}
+        for method, count, errors, total, recent in sorted(items):
+            durations = sorted(duration for _, duration in recent)
+            in_window = sum(1 for end, _ in recent if now - end <= self.THROUGHPUT_WINDOW)
+            result[method] = {
+                'count': count,
+                'errors': errors,
+                'error_rate': errors / count if count else 0.0,
+                'mean': total / count if count else 0.0,
+                'p50': _percentile(durations, 0.50),
+                'p95': _percentile(durations, 0.95),
+                'p99': _percentile(durations, 0.99),
+                'throughput': in_window / self.THROUGHPUT_WINDOW,
+            }
+        return result
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix='device_transaction'):
+        """Prometheus 文本格式：每个 method 一个直方图和错误计数"""
+        with self._lock:
+            items = sorted((method, list(stats.bucket_counts), stats.count,
+                            stats.errors, stats.total)
+                           for method, stats in self._stats.items())
+
+        lines = [f'# HELP {prefix}_seconds Device transaction latency',
+                 f'# TYPE {prefix}_seconds histogram']
+        for method, bucket_counts, count, _, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_seconds_bucket{{method="{method}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_seconds_sum{{method="{method}"}} {total}')
+            lines.append(f'{prefix}_seconds_count{{method="{method}"}} {count}')
+
+        lines += [f'# HELP {prefix}_errors_total Failed device transactions',
+                  f'# TYPE {prefix}_errors_total counter']
+        for method, _, _, errors, _ in items:
+            lines.append(f'{prefix}_errors_total{{method="{method}"}} {errors}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+metrics = Metrics()
+
+
+def _succeeded(result):
+    # GuiApi 接口返回 (ret, data)，ret 为 False 表示失败
+    return not (isinstance(result, tuple) and result and result[0] is False)
+
+
+def instrumented(prefix):
+    """装饰 GuiApi 风格的接口 f(cls, side, lane, ...)，以 "{prefix}.{函数名}"
+    为 method 记录每次调用
+
+    同时支持普通函数和协程函数。
+    """
+    def decorator(func):
+        name = f'{prefix}.{func.__name__}'
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(cls, side=None, lane=None, *args, **kwargs):
+                with metrics.timed(name, side, lane) as timing:
+                    result = await func(cls, side, lane, *args, **kwargs)
+                    timing.ok = _succeeded(result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(cls, side=None, lane=None, *args, **kwargs):
+            with metrics.timed(name, side, lane) as timing:
+                result = func(cls, side, lane, *args, **kwargs)
+                timing.ok = _succeeded(result)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,158 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from .gui_api import GuiApi, columns_to_rows, rows_to_columns
+
+
+class RegisterCache:
+    """GuiApi 前的读缓存
+
+    - 缓存项以 (method, side, lane, dir) 为 key，保存最近一次读到的属性值
+    - 每个属性可以单独指定 TTL，缓存项在其中最短的 TTL 到期后失效
+    - 超过 max_entries 时按 LRU 淘汰
+    - set 成功后把写入的值回写到对应的读缓存项
+
+    对外提供与 GuiApi 相同的接口，可以直接替换 GuiApi 传给 DeviceOperThread。
+    """
+    DEFAULT_TTL = 2.0
+    MAX_ENTRIES = 4096
+
+    def __init__(self, api=GuiApi, ttl=None, default_ttl=None, max_entries=None):
+        self.api = api
+        # 属性名 -> TTL（秒）
+        self.ttl = dict(ttl or {})
+        self.default_ttl = self.DEFAULT_TTL if default_ttl is None else default_ttl
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._entries = OrderedDict()  # key -> (expire_at, values)
+        self._lock = threading.Lock()
+        self._force = False
+
+    def revalidating(self):
+        """返回共享同一份缓存、但总是访问设备并刷新缓存的视图"""
+        view = copy.copy(self)
+        view._force = True
+        return view
+
+    def getDriver(self, side, lane):
+        return self._read('getDriver', side, lane, ())
+
+    def setDriver(self, side, lane, data):
+        return self._write('setDriver', 'getDriver', side, lane, (), data)
+
+    def getAfe(self, side, lane, dir):
+        return self._read('getAfe', side, lane, (dir,))
+
+    def setAfe(self, side, lane, dir, data):
+        return self._write('setAfe', 'getAfe', side, lane, (dir,), data)
+
+    def getDriverLanes(self, side, lanes):
+        return self._read_lanes('getDriver', side, lanes, ())
+
+    def setDriverLanes(self, side, lanes, data):
+        return self._write_lanes('setDriver', 'getDriver', side, lanes, (), data)
+
+    def getAfeLanes(self, side, lanes, dir):
+        return self._read_lanes('getAfe', side, lanes, (dir,))
+
+    def setAfeLanes(self, side, lanes, dir, data):
+        return self._write_lanes('setAfe', 'getAfe', side, lanes, (dir,), data)
+
+    def peek(self, method, side, lane, *args):
+        """返回缓存的值（即使已过期），不访问设备；没有缓存时返回 None"""
+        with self._lock:
+            entry = self._entries.get(self._key(method, side, lane, args))
+            return dict(entry[1]) if entry else None
+
+    def invalidate(self, method=None, side=None, lane=None):
+        """删除匹配的缓存项，参数为 None 表示匹配任意值"""
+        with self._lock:
+            for key in list(self._entries):
+                if (method is None or key[0] == method) and \
+                        (side is None or key[1] == side) and \
+                        (lane is None or key[2] == lane):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _key(method, side, lane, args):
+        return (method, side, lane, args[0] if args else None)
+
+    def _lookup(self, key):
+        """返回未过期的缓存值，命中时刷新 LRU 顺序"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry[1])
+
+    def _store(self, key, values):
+        ttl = min((self.ttl.get(name, self.default_ttl) for name in values),
+                  default=self.default_ttl)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, dict(values))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _merge(self, key, values):
+        """把写入的值合并到已有缓存项，不改变其过期时间"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # 批量写入时 None 表示该 lane 未写此属性
+                entry[1].update({name: value for name, value in values.items()
+                                 if value is not None})
+
+    def _read(self, method, side, lane, args):
+        key = self._key(method, side, lane, args)
+        if not self._force:
+            values = self._lookup(key)
+            if values is not None:
+                return True, values
+
+        ret, values = getattr(self.api, method)(side, lane, *args)
+        if ret:
+            self._store(key, values)
+        return ret, values
+
+    def _read_lanes(self, method, side, lanes, args):
+        lanes = list(lanes)
+        hits = {}
+        if not self._force:
+            for lane in lanes:
+                values = self._lookup(self._key(method, side, lane, args))
+                if values is not None:
+                    hits[lane] = values
+
+        # 只对未命中的 lane 发起一次批量读取
+        misses = [lane for lane in lanes if lane not in hits]
+        if misses:
+            ret, columns = getattr(self.api, f'{method}Lanes')(side, misses, *args)
+            if not ret:
+                return ret, columns
+            for lane, values in columns_to_rows(columns):
+                self._store(self._key(method, side, lane, args), values)
+                hits[lane] = values
+
+        return True, rows_to_columns(lanes, [hits.get(lane, {}) for lane in lanes])
+
+    def _write(self, set_method, get_method, side, lane, args, data):
+        ret, written = getattr(self.api, set_method)(side, lane, *args, data)
+        if ret:
+            self._merge(self._key(get_method, side, lane, args), written)
+        return ret, written
+
+    def _write_lanes(self, set_method, get_method, side, lanes, args, data):
+        ret, written = getattr(self.api, f'{set_method}Lanes')(side, lanes, *args, data)
+        if ret:
+            for lane, values in columns_to_rows(dict(written, lane=list(lanes))):
+                self._merge(self._key(get_method, side, lane, args), values)
+        return ret, written
@@ -0,0 +1,245 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .app_dirs import user_data_dir
+from .gui_api import columns_to_rows
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    device TEXT NOT NULL, op TEXT NOT NULL, side TEXT NOT NULL, lane INTEGER NOT NULL,
+    dir TEXT NOT NULL, key TEXT NOT NULL, value, time REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS readings_lane_time ON readings (device, side, lane, time);
+CREATE TABLE IF NOT EXISTS latest (
+    device TEXT NOT NULL, op TEXT NOT NULL, side TEXT NOT NULL, lane INTEGER NOT NULL,
+    dir TEXT NOT NULL, key TEXT NOT NULL, value, time REAL NOT NULL,
+    PRIMARY KEY (device, op, side, lane, dir, key)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY, device TEXT NOT NULL, label TEXT, time REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS snapshot_values (
+    snapshot_id INTEGER NOT NULL, op TEXT NOT NULL, side TEXT NOT NULL, lane INTEGER NOT NULL,
+    dir TEXT NOT NULL, key TEXT NOT NULL, value,
+    PRIMARY KEY (snapshot_id, op, side, lane, dir, key)) WITHOUT ROWID;
+"""
+
+_KEY_COLUMNS = ('op', 'side', 'lane', 'dir', 'key')
+
+def default_path():
+    """快照数据库的默认位置
+
+    GUI_SNAPSHOT_DB 环境变量优先；否则放在用户数据目录中（见
+    app_dirs.user_data_dir），不随当前工作目录变化。
+    """
+    path = os.environ.get('GUI_SNAPSHOT_DB')
+    if path:
+        return Path(path)
+    return user_data_dir() / 'snapshots.sqlite3'
+
+
+class SnapshotStore:
+    """寄存器读数存储（SQLite）
+
+    - 每次设备读取（get* 接口）的结果都追加到 readings，按 (device, side,
+      lane, time) 建索引，同时更新 latest 中每个属性的最新值
+    - take_snapshot 把某个设备当前的最新值固定为一个快照
+    - diff 比较两个快照或两块板子的最新值，只返回不同的属性
+
+    写入由后台线程批量完成，读取接口的调用方不会等待磁盘。
+
+    readings 只保留最近 retention 秒、最多 max_readings 条读数，超出的
+    旧读数由写入线程定期删除（latest 与快照不受影响）。enabled 为 False
+    时不记录任何读数。
+    """
+    FLUSH_INTERVAL = 0.2  # 秒
+    RETENTION = 7 * 24 * 3600  # 秒
+    MAX_READINGS = 2_000_000
+    PRUNE_INTERVAL = 60.0  # 秒
+    JOURNAL_SIZE_LIMIT = 16 * 1024 * 1024  # WAL 文件检查点后截断到的大小
+
+    def __init__(self, path=None, enabled=True, retention=None, max_readings=None):
+        self.path = Path(path) if path else default_path()
+        self.enabled = enabled
+        self.retention = retention or self.RETENTION
+        self.max_readings = max_readings or self.MAX_READINGS
+        self._last_prune = 0.0
+        self._queue = queue.Queue()
+        self._conn = None
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def capture(self, device, method, args, result):
+        """记录一次 get* 调用的结果，args 为 (side, lane 或 lanes[, dir])"""
+        if not self.enabled or not method.startswith('get'):
+            return
+        ret, data = result
+        if ret is False:
+            return
+        side = args[0]
+        dir = args[2] if len(args) > 2 else ''
+        op = method.removesuffix('Lanes')
+        rows = columns_to_rows(data) if method.endswith('Lanes') else [(args[1], data)]
+        now = time.time()
+        self._ensure_writer()
+        self._queue.put([(device, op, side, lane, dir, key, value, now)
+                         for lane, values in rows
+                         for key, value in values.items() if value is not None])
+
+    def flush(self):
+        """等待已提交的读数全部写入"""
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def take_snapshot(self, device, label=None):
+        """把设备当前的最新值保存为快照，返回快照 id"""
+        self.flush()
+        conn = self._connection()
+        with self._lock, conn:
+            cursor = conn.execute(
+                "INSERT INTO snapshots (device, label, time) VALUES (?, ?, ?)",
+                (device, label, time.time()))
+            snapshot_id = cursor.lastrowid
+            conn.execute(
+                "INSERT INTO snapshot_values SELECT ?, op, side, lane, dir, key, value "
+                "FROM latest WHERE device = ?", (snapshot_id, device))
+        return snapshot_id
+
+    def snapshots(self):
+        """[(id, device, label, time)]，新的在前"""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT id, device, label, time FROM snapshots ORDER BY id DESC").fetchall()
+
+    def devices(self):
+        self.flush()
+        with self._lock:
+            return [row[0] for row in self._connection().execute(
+                "SELECT DISTINCT device FROM latest ORDER BY device")]
+
+    def values(self, source):
+        """{(op, side, lane, dir, key): value}，source 见 diff"""
+        table, where, params = self._source(source)
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT op, side, lane, dir, key, value FROM {table} WHERE {where}", params)
+            return {row[:5]: row[5] for row in rows}
+
+    def diff(self, left, right):
+        """比较两组读数，返回 [(op, side, lane, dir, key, left_value, right_value)]
+
+        left/right 为 ('snapshot', id) 或 ('device', name)（设备的最新值）。
+        只存在于一侧的属性，另一侧的值为 None。
+        """
+        self.flush()
+        l_table, l_where, l_params = self._source(left, 'l')
+        r_table, r_where, r_params = self._source(right, 'r')
+        on = ' AND '.join(f'l.{c} = r.{c}' for c in _KEY_COLUMNS)
+        cols = ', '.join(f'l.{c}' for c in _KEY_COLUMNS)
+        r_cols = ', '.join(f'r.{c}' for c in _KEY_COLUMNS)
+        # 参数按占位符在语句中出现的顺序排列
+        sql = (f"SELECT {cols}, l.value, r.value FROM {l_table} l "
+               f"LEFT JOIN (SELECT * FROM {r_table} r WHERE {r_where}) r ON {on} "
+               f"WHERE {l_where} AND l.value IS NOT r.value "
+               f"UNION ALL "
+               f"SELECT {r_cols}, NULL, r.value FROM {r_table} r "
+               f"LEFT JOIN (SELECT * FROM {l_table} l WHERE {l_where}) l ON {on} "
+               f"WHERE {r_where} AND l.key IS NULL "
+               f"ORDER BY 1, 2, 3, 4, 5")
+        with self._lock:
+            return self._connection().execute(
+                sql, r_params + l_params + l_params + r_params).fetchall()
+
+    def history(self, device, side, lane, key, since=None):
+        """某个属性的历史读数 [(time, value)]"""
+        self.flush()
+        with self._lock:
+            return self._connection().execute(
+                "SELECT time, value FROM readings WHERE device = ? AND side = ? AND lane = ? "
+                "AND key = ? AND time >= ? ORDER BY time",
+                (device, side, lane, key, since or 0)).fetchall()
+
+    def prune(self):
+        """删除超出保留时间或条数上限的旧读数"""
+        self._last_prune = time.monotonic()
+        conn = self._connection()
+        with self._lock, conn:
+            conn.execute("DELETE FROM readings WHERE time < ?", (time.time() - self.retention,))
+            # rowid 随插入递增，按 rowid 截断即保留最新的 max_readings 条
+            (last,) = conn.execute("SELECT max(rowid) FROM readings").fetchone()
+            if last is not None and last > self.max_readings:
+                conn.execute("DELETE FROM readings WHERE rowid <= ?", (last - self.max_readings,))
+
+    def close(self):
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _source(source, alias=None):
+        kind, name = source
+        prefix = f'{alias}.' if alias else ''
+        if kind == 'snapshot':
+            return 'snapshot_values', f'{prefix}snapshot_id = ?', (name,)
+        if kind == 'device':
+            return 'latest', f'{prefix}device = ?', (name,)
+        raise ValueError(f"unknown source {kind!r}")
+
+    def _connection(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(f"PRAGMA journal_size_limit={self.JOURNAL_SIZE_LIMIT}")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._connection()
+                    self._writer = threading.Thread(
+                        target=self._write_loop, name='snapshot-writer', daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            items = [self._queue.get()]
+            # 攒一小段时间再批量写入
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while True:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0 or isinstance(items[-1], threading.Event) or items[-1] is None:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            rows = [row for item in items if isinstance(item, list) for row in item]
+            if rows:
+                with self._lock, self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO readings VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO latest VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                if time.monotonic() - self._last_prune >= self.PRUNE_INTERVAL:
+                    self.prune()
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if items[-1] is None:
+                return
+
+
+snapshot_store = SnapshotStore()
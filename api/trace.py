@@ -0,0 +1,301 @@
+import gzip
+import io
+import itertools
+import os
+import pickle
+import struct
+import threading
+import time
+from collections import defaultdict
+
+from . import cancel_token
+from .gui_api import GuiApi, GuiConnection, columns_to_rows, current_connection, rows_to_columns
+
+# 文件头：MAGIC + 格式版本（uint16），格式变化时递增 FORMAT_VERSION
+MAGIC = b'GUITRACE'
+FORMAT_VERSION = 2
+_HEADER = struct.Struct('<H')
+_LENGTH = struct.Struct('<I')
+# 记录用固定协议的 pickle 编码（各 Python 版本之间稳定），只包含基本类型，
+# 读取时不允许引用任何类或函数（见 _RecordUnpickler）
+PICKLE_PROTOCOL = 4
+
+API_METHODS = ('getDriver', 'setDriver', 'getAfe', 'setAfe',
+               'getDriverLanes', 'setDriverLanes', 'getAfeLanes', 'setAfeLanes')
+
+
+class ReplayedError(Exception):
+    """回放录制时发生的异常"""
+
+
+class _RecordUnpickler(pickle.Unpickler):
+    """只还原基本类型，trace 文件中出现任何类/函数引用都视为无效"""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"unexpected object {module}.{name} in trace record")
+
+
+class TraceWriter:
+    """二进制 trace 文件：gzip 压缩，文件头后为长度前缀的 pickle 记录
+
+    每条记录为 (kind, device, name, args, result, start, duration, error)，
+    kind 为 'api' 或 'operation'，start 为相对录制开始的秒数。
+    """
+    FLUSH_EVERY = 256  # 条记录
+
+    def __init__(self, path):
+        self.path = path
+        self._file = gzip.open(path, 'wb', compresslevel=6)
+        self._file.write(MAGIC + _HEADER.pack(FORMAT_VERSION))
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.started_at = time.monotonic()
+        self.count = 0
+
+    def write(self, record):
+        data = pickle.dumps(record, PICKLE_PROTOCOL)
+        with self._lock:
+            self._file.write(_LENGTH.pack(len(data)))
+            self._file.write(data)
+            self.count += 1
+            self._pending += 1
+            if self._pending >= self.FLUSH_EVERY:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def read_trace(path):
+    """逐条产出 trace 中的记录"""
+    with gzip.open(path, 'rb') as f:
+        header = f.read(len(MAGIC) + _HEADER.size)
+        if not header.startswith(MAGIC) or len(header) < len(MAGIC) + _HEADER.size:
+            raise ValueError(f"{path} is not a GUI trace file")
+        (version,) = _HEADER.unpack(header[len(MAGIC):])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported trace format version {version}"
+                             f" (expected {FORMAT_VERSION})")
+        while True:
+            header = f.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                return  # 录制中断时最后一条可能不完整
+            yield _RecordUnpickler(io.BytesIO(data)).load()
+
+
+class TraceRecorder:
+    """录制代理：对外提供与 GuiApi 相同的接口，转发给 api 并记录每次调用
+
+    可以作为 SessionPool/DeviceSession 的 api 使用；Operation 的调用通过
+    record_operation 记录。
+    """
+
+    def __init__(self, path, api=GuiApi):
+        self.api = api
+        self.writer = TraceWriter(path)
+        for method in API_METHODS:
+            setattr(self, method, self._recording(method))
+
+    def open_connection(self, device):
+        return self.api.open_connection(device)
+
+    def record_operation(self, name, kwargs, start, duration, error=None):
+        self._write('operation', None, name, _plain(kwargs), None, start, duration, error)
+
+    def close(self):
+        self.writer.close()
+
+    def _recording(self, method):
+        target = getattr(self.api, method)
+
+        def call(*args):
+            start = time.monotonic()
+            try:
+                result = target(*args)
+            except cancel_token.OperationCancelled:
+                raise
+            except Exception as e:
+                self._write('api', None, method, args, None, start,
+                            time.monotonic() - start, f'{type(e).__name__}: {e}')
+                raise
+            self._write('api', None, method, args, result, start, time.monotonic() - start, None)
+            return result
+        call.__name__ = method
+        return call
+
+    def _write(self, kind, device, name, args, result, start, duration, error):
+        if device is None:
+            connection = current_connection()
+            device = connection.device if connection is not None else None
+        self.writer.write((kind, device, name, _plain(args), _plain(result),
+                           start - self.writer.started_at, duration, error))
+
+
+class TraceReplayer:
+    """回放后端：按录制的结果与耗时响应 GuiApi 接口
+
+    speed 为回放速度倍数：1 为录制时的速度，N 为 N 倍速，0 或 None 表示
+    不等待。
+
+    调用参数与录制时完全一致的按录制顺序回放（包括失败与异常，用完后
+    循环）；没有录制过的 lane/lane 组合由录制过的各 lane 数据拼出
+    （lane 按取模映射），可以用少量录制数据模拟更多的 lane 和板子。
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+        self._exact = defaultdict(list)      # (method, args) -> [record]
+        self._lane_values = defaultdict(lambda: defaultdict(list))  # (op, side, dir) -> {lane: [values]}
+        self._durations = defaultdict(list)  # method -> [duration]
+        self._operations = defaultdict(list)  # name -> [record]
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._load()
+        for method in API_METHODS:
+            setattr(self, method, self._replaying(method))
+
+    def open_connection(self, device):
+        return GuiConnection(device)
+
+    def replay_operation(self, name, kwargs):
+        """按录制的耗时与结果回放一次 Operation 调用"""
+        record = self._next(('operation', name), self._operations.get(name))
+        if record is None:
+            return
+        self._sleep(record[6])
+        if record[7]:
+            raise ReplayedError(record[7])
+
+    def _load(self):
+        for record in read_trace(self.path):
+            kind, device, name, args, result, start, duration, error = record
+            if kind == 'operation':
+                self._operations[name].append(record)
+                continue
+            self._exact[(name, _key(args))].append(record)
+            self._durations[name].append(duration)
+            if name.startswith('get') and error is None and result and result[0] is not False:
+                op = name.removesuffix('Lanes')
+                side = args[0]
+                dir = args[2] if len(args) > 2 else None
+                rows = columns_to_rows(result[1]) if name.endswith('Lanes') else [(args[1], result[1])]
+                for lane, values in rows:
+                    self._lane_values[(op, side, dir)][lane].append(values)
+
+    def _replaying(self, method):
+        def call(*args):
+            record = self._next(('exact', method, _key(args)), self._exact.get((method, _key(args))))
+            if record is not None:
+                self._sleep(record[6])
+                if record[7]:
+                    raise ReplayedError(record[7])
+                return record[4]
+
+            self._sleep(self._next_duration(method))
+            if method.startswith('set'):
+                data = args[-1]
+                return (True, dict(data, lane=list(args[1]))) if method.endswith('Lanes') else (True, data)
+            return self._synthesize(method, args)
+        call.__name__ = method
+        return call
+
+    def _synthesize(self, method, args):
+        op = method.removesuffix('Lanes')
+        side = args[0]
+        dir = args[2] if len(args) > 2 else None
+        by_lane = self._lane_values.get((op, side, dir)) or self._lane_values.get((op, side, None))
+        if not by_lane:
+            raise ReplayedError(f"no recorded data for {op} on {side}")
+        recorded = sorted(by_lane)
+
+        def values_for(lane):
+            source = lane if lane in by_lane else recorded[lane % len(recorded)]
+            return dict(self._next(('lane', op, side, dir, source), by_lane[source]))
+
+        if method.endswith('Lanes'):
+            lanes = list(args[1])
+            return True, rows_to_columns(lanes, [values_for(lane) for lane in lanes])
+        return True, values_for(args[1])
+
+    def _next(self, cursor_key, records):
+        if not records:
+            return None
+        with self._lock:
+            cursor = self._cursors.get(cursor_key)
+            if cursor is None:
+                cursor = self._cursors[cursor_key] = itertools.cycle(records)
+            return next(cursor)
+
+    def _next_duration(self, method):
+        durations = self._durations.get(method)
+        if not durations:
+            # 没有录制过的接口，用同类接口（单 lane/批量）的耗时
+            durations = self._durations.get(method.removesuffix('Lanes')) or \
+                self._durations.get(f'{method}Lanes')
+        return self._next(('duration', method), durations) or 0.0
+
+    def _sleep(self, duration):
+        if self.speed and duration:
+            cancel_token.sleep(duration / self.speed)
+
+
+def _plain(value):
+    """转换为可以写入 trace 的基本类型"""
+    if isinstance(value, tuple):
+        return tuple(_plain(item) for item in value)
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, range):
+        return list(value)
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    return str(value)
+
+
+def _key(args):
+    return repr(_plain(args))
+
+
+def install_from_env(environ=os.environ):
+    """按环境变量启用录制或回放：
+
+    GUI_TRACE_RECORD=<path>   录制所有设备调用
+    GUI_TRACE_REPLAY=<path>   用 trace 代替设备，GUI_TRACE_SPEED 为回放速度
+                              （默认 1，0 表示不等待）
+
+    需要在创建任何设备会话之前调用。返回启用的 recorder/replayer，
+    未启用时返回 None。
+    """
+    from .device_session import session_pool
+
+    record_path = environ.get('GUI_TRACE_RECORD')
+    replay_path = environ.get('GUI_TRACE_REPLAY')
+    backend = None
+    if replay_path:
+        backend = TraceReplayer(replay_path, float(environ.get('GUI_TRACE_SPEED', 1.0)))
+    elif record_path:
+        backend = TraceRecorder(record_path, session_pool.api)
+    if backend is not None:
+        session_pool.api = backend
+    global _installed
+    _installed = backend
+    return backend
+
+
+_installed = None
+
+
+def shutdown():
+    """关闭 install_from_env 启用的录制文件"""
+    if isinstance(_installed, TraceRecorder):
+        _installed.close()
@@ -0,0 +1,245 @@
+"""无界面的性能基准
+
+在 offscreen 平台上运行表格与线程相关的基准，结果以 JSON 输出，便于
+在改动表格/线程代码时对比回归：
+
+    python benchmarks/bench_gui.py --latency 0.005 --jitter 0.002 -o bench.json
+
+GuiApi 的事务耗时由 --latency/--jitter 控制，load/refresh 的结果包含
+这部分设备耗时。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PySide6 import __version__ as pyside_version  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from api.gui_api import GuiApi  # noqa: E402
+from api.snapshot_store import snapshot_store  # noqa: E402
+from widgets.table_three import TableThree  # noqa: E402
+from widgets.table_two import TableTwo  # noqa: E402
+from widgets.utils.base_frame import ConsoleWidget  # noqa: E402
+from widgets.utils.device_oper_thread import DeviceOperThread  # noqa: E402
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'n': len(samples),
+        'min': samples[0],
+        'median': statistics.median(samples),
+        'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max': samples[-1],
+    }
+
+
+def wait_until(app, predicate, timeout=60.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError('benchmark step timed out')
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+def rss_bytes():
+    """当前进程的常驻内存，无法获取时返回 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def make_table(table_cls, lanes):
+    side = 'Host Side' if table_cls is TableTwo else 'Line Side'
+    table = table_cls(side, device=f'bench-{table_cls.__name__}-{lanes}')
+    table.LANE_COUNT = lanes
+    table.resize(1200, 800)
+    table.show()
+    return table
+
+
+def bench_load(app, table_cls, lanes, repeat):
+    """完整加载一张表（无缓存）所需时间"""
+    table = make_table(table_cls, lanes)
+    samples = []
+    for _ in range(repeat):
+        table.session.cache.clear()
+        start = time.perf_counter()
+        table.load_data()
+        wait_until(app, lambda: table.fetcher_thread is None
+                   and table.tableWidget.lane_model.rowCount() == lanes)
+        samples.append(time.perf_counter() - start)
+    table.close()
+    return {'table': table_cls.__name__, 'lanes': lanes, 'seconds': summarize(samples)}
+
+
+def bench_refresh(app, table_cls, lanes, repeat):
+    """监控模式一个周期：从发起读取到所有行更新完毕"""
+    table = make_table(table_cls, lanes)
+    table.load_data()
+    wait_until(app, lambda: table.fetcher_thread is None)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        table._poll_lanes()
+        wait_until(app, lambda: not table._inflight_lanes)
+        samples.append(time.perf_counter() - start)
+    table.close()
+    return {'table': table_cls.__name__, 'lanes': lanes, 'seconds': summarize(samples)}
+
+
+def bench_update_row(app, lanes, updates):
+    """update_row 每次调用的耗时（所有值都变化的最坏情况）"""
+    table = make_table(TableTwo, lanes)
+    view = table.tableWidget
+    values = [GuiApi._read_driver(table.side, lane) for lane in range(lanes)]
+    for lane in range(lanes):
+        view.update_row(True, lane, values[lane])
+    app.processEvents()
+
+    start = time.perf_counter()
+    for i in range(updates):
+        lane = i % lanes
+        row = values[lane]
+        for key in row:
+            if key != 'driver_mode':
+                row[key] += 1
+        view.update_row(True, lane, row)
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    table.close()
+    return {'lanes': lanes, 'updates': updates, 'us_per_row': elapsed / updates * 1e6}
+
+
+def bench_delivery(app, lanes, interval):
+    """逐 lane 读取时结果送达 GUI 线程的次数与 GUI 线程处理耗时
+
+    interval 为 DeviceOperThread.COALESCE_INTERVAL，0 表示每完成一批就立即发出。
+    """
+    table = make_table(TableTwo, 0)
+    view = table.tableWidget
+    deliveries = []
+
+    def apply(results):
+        start = time.perf_counter()
+        view.update_results(results)
+        deliveries.append(time.perf_counter() - start)
+
+    thread = DeviceOperThread('getDriver', table.side, range(lanes), batch_size=1,
+                              max_workers=16, api=GuiApi)
+    thread.COALESCE_INTERVAL = interval
+    thread.results_ready.connect(apply)
+    thread.start()
+    wait_until(app, lambda: thread.isFinished()
+               and view.lane_model.rowCount() == lanes)
+    table.close()
+    return {'lanes': lanes, 'interval': interval, 'deliveries': len(deliveries),
+            'gui_ms': sum(deliveries) * 1000}
+
+
+def bench_memory(app, lanes):
+    """每行占用的内存：Python 对象（tracemalloc）与进程 RSS 增量"""
+    table = make_table(TableTwo, 0)
+    view = table.tableWidget
+    rows = [GuiApi._read_driver(table.side, lane) for lane in range(lanes)]
+    app.processEvents()
+
+    rss_before = rss_bytes()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for lane, row in enumerate(rows):
+        view.update_row(True, lane, row)
+    app.processEvents()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    rss_after = rss_bytes()
+
+    python_bytes = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    table.close()
+    return {
+        'lanes': lanes,
+        'python_bytes_per_row': python_bytes / lanes,
+        'rss_bytes_per_row': None if rss_before is None else (rss_after - rss_before) / lanes,
+    }
+
+
+def bench_console(app, lines):
+    """控制台写入吞吐：log() 写入缓冲并完成一次批量刷新"""
+    console = ConsoleWidget()
+    console.show()
+    start = time.perf_counter()
+    for i in range(lines):
+        console.log(f'begin:{i % 256} lane{i % 256}: ok')
+    console.log_sink.flush()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    console.close()
+    return {'lines': lines, 'lines_per_second': lines / elapsed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lanes', default='8,64,256',
+                        help='comma separated lane counts for load/refresh benchmarks')
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='simulated device transaction latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='uniform jitter (+/- seconds) added to each transaction')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--updates', type=int, default=5000,
+                        help='number of update_row calls to time')
+    parser.add_argument('--console-lines', type=int, default=50000)
+    parser.add_argument('--snapshots', action='store_true',
+                        help='also record reads in the snapshot database (off by default)')
+    parser.add_argument('-o', '--output', help='write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    GuiApi.TRANSACTION_DELAY = args.latency
+    GuiApi.TRANSACTION_JITTER = args.jitter
+    GuiApi.CONNECT_DELAY = 0.0
+    # 基准产生的大量读数没有保留价值，默认不写入快照数据库
+    snapshot_store.enabled = args.snapshots
+    lane_counts = [int(n) for n in args.lanes.split(',')]
+
+    app = QApplication.instance() or QApplication([])
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pyside': pyside_version,
+            'platform': platform.platform(),
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'repeat': args.repeat,
+        },
+        'load': [bench_load(app, cls, lanes, args.repeat)
+                 for cls in (TableTwo, TableThree) for lanes in lane_counts],
+        'refresh': [bench_refresh(app, cls, lanes, args.repeat)
+                    for cls in (TableTwo, TableThree) for lanes in lane_counts],
+        'update_row': [bench_update_row(app, lanes, args.updates) for lanes in lane_counts],
+        'delivery': [bench_delivery(app, lanes, interval) for lanes in lane_counts
+                     for interval in (0.0, DeviceOperThread.COALESCE_INTERVAL)],
+        'memory': [bench_memory(app, lanes) for lanes in lane_counts],
+        'console': bench_console(app, args.console_lines),
+    }
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
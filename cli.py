@@ -0,0 +1,292 @@
+"""无界面的批量脚本入口
+
+与 GUI 共用 GuiApi、设备会话、LaneExecutor 和 Operation，但不导入
+QtWidgets，适合回归测试时在大量板子上批量读写寄存器、复位和导出日志：
+
+    python cli.py regression.yaml --device board1 --device board2
+
+脚本为 JSON/YAML，steps 在每个设备上依次执行，不同设备之间并行：
+
+    devices: [board1, board2]
+    steps:
+      - {read: driver.json, side: Host Side, lanes: all}
+      - {read: afe.json, side: Line Side, lanes: 0-3, args: [rx]}
+      - {write: driver.json, side: Host Side, lanes: [0, 1], values: {driver_mode: 3}}
+      - {op: power_reset}
+      - {op: dump_log, output_dir: device_logs}
+
+read/write 的值为页面声明文件（见 schemas），lanes 可以是列表、"0-7,12"
+形式的字符串或 all（声明中的 lane_count）。每个批次/操作的结果作为一行
+JSON 写到 stdout，最后一行为汇总；操作本身的打印输出转到 stderr。
+某一步失败后，该设备余下的步骤不再执行。
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from api import trace
+from api.cancel_token import CancelToken, OperationCancelled
+from api.device_session import DEFAULT_DEVICE, session_pool
+from api.gui_api import GuiApi, rows_to_columns
+from api.metrics import metrics
+from api.snapshot_store import snapshot_store
+from operation import Operation
+from widgets.utils.lane_executor import LaneExecutor
+from widgets.utils.register_schema import load_schema
+
+
+class StepFailed(Exception):
+    """脚本中的一步执行失败"""
+
+
+def load_script(path):
+    """读取 JSON/YAML 脚本，'-' 表示从 stdin 读取 JSON"""
+    if path == '-':
+        return json.load(sys.stdin)
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        if path.suffix in ('.yaml', '.yml'):
+            if yaml is None:
+                raise RuntimeError(f"PyYAML is required to load {path}")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def parse_lanes(spec, lane_count):
+    """lanes 字段 -> lane 列表：all、整数、列表或 "0-7,12" 形式的字符串"""
+    if spec is None or spec == 'all':
+        return list(range(lane_count))
+    if isinstance(spec, int):
+        return [spec]
+    if isinstance(spec, str):
+        lanes = []
+        for part in spec.split(','):
+            first, _, last = part.strip().partition('-')
+            lanes.extend(range(int(first), int(last or first) + 1))
+        return lanes
+    return [int(lane) for lane in spec]
+
+
+class JsonLinesOutput:
+    """多个线程共用的 JSON Lines 输出，每条结果立即写出"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def emit(self, **record):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+class ScriptRunner:
+    """在多个设备上并行执行同一个脚本
+
+    每个设备使用 session_pool 中的会话，寄存器读写按 BATCH_SIZE 分组后
+    由 LaneExecutor 并发执行，操作通过 Operation.run 执行，与 GUI 走同一条
+    路径（同样的连接复用、并发上限、指标和快照记录）。
+    """
+    # 批量接口每次事务包含的最大 lane 数
+    BATCH_SIZE = 16
+
+    def __init__(self, steps, output, max_workers=None, batch_size=None):
+        self.steps = [self._compile(index, step) for index, step in enumerate(steps)]
+        self.output = output
+        self.max_workers = max_workers
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.token = CancelToken()
+
+    def cancel(self):
+        self.token.cancel()
+
+    def run(self, devices, parallel=None):
+        """在所有设备上执行脚本，返回 {device: 'done'/'failed'/'cancelled'}"""
+        devices = list(devices) or [DEFAULT_DEVICE]
+        pool = ThreadPoolExecutor(max_workers=parallel or len(devices),
+                                  thread_name_prefix='cli-device')
+        try:
+            return dict(zip(devices, pool.map(self._run_device, devices)))
+        except BaseException:
+            # Ctrl+C 等：让所有设备在当前事务结束后停止
+            self.cancel()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+
+    def _compile(self, index, step):
+        """检查步骤并预先解析页面声明，脚本有误时在连接任何设备之前报错"""
+        if 'op' in step:
+            return step
+        action = 'read' if 'read' in step else 'write' if 'write' in step else None
+        if action is None:
+            raise ValueError(f"step {index}: expected one of op/read/write")
+        schema = load_schema(step[action])
+        side = step.get('side') or (schema.sides[0] if schema.sides else 'Host Side')
+        compiled = dict(step, action=action, schema=schema, side=side,
+                        lanes=parse_lanes(step.get('lanes'), schema.lane_count),
+                        args=tuple(step.get('args', schema.dev_op_args)))
+        if action == 'write':
+            fields = {field.key: field for field in schema.layout(side).fields if field}
+            values = {}
+            for key, value in step.get('values', {}).items():
+                field = fields.get(key)
+                if field is None or not field.editable:
+                    raise ValueError(f"step {index}: {key} is not writable on {side}")
+                values[key] = field.convert(value)
+            compiled['values'] = values
+        return compiled
+
+    def _run_device(self, device):
+        session = session_pool.get(device)
+        for index, step in enumerate(self.steps):
+            if self.token.cancelled:
+                return 'cancelled'
+            try:
+                if 'op' in step:
+                    self._run_operation(session, index, step)
+                else:
+                    self._run_registers(session, index, step)
+            except OperationCancelled:
+                return 'cancelled'
+            except StepFailed:
+                return 'failed'
+        return 'done'
+
+    def _run_operation(self, session, index, step):
+        kwargs = {key: value for key, value in step.items() if key != 'op'}
+        start = time.perf_counter()
+        try:
+            result = Operation.run(step['op'], kwargs, session,
+                                   log=lambda text: print(f"[{session.device}] {text.rstrip()}",
+                                                          file=sys.stderr),
+                                   token=self.token)
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            self._emit(session, index, step['op'], start, ok=False, error=str(e))
+            raise StepFailed() from e
+        extra = {}
+        if result is None:
+            pass
+        elif step['op'] == 'upgrade':
+            extra['crc32'] = f'{result:08x}'
+        elif step['op'] == 'dump_log':
+            extra['files'] = [str(path) for path in result.files]
+        self._emit(session, index, step['op'], start, ok=True, **extra)
+
+    def _run_registers(self, session, index, step):
+        schema = step['schema']
+        method = getattr(session, f"{'get' if step['action'] == 'read' else 'set'}"
+                                  f"{schema.dev_op}Lanes")
+        lanes = step['lanes']
+        chunks = [tuple(lanes[i:i + self.batch_size])
+                  for i in range(0, len(lanes), self.batch_size)]
+        start = time.perf_counter()
+        failed = False
+        for chunk, result in LaneExecutor.run_lanes(
+                (session.device, step['side']),
+                lambda chunk: self._lanes_op(method, step, chunk),
+                chunks, self.max_workers, self.token):
+            if isinstance(result, OperationCancelled):
+                raise result
+            if isinstance(result, Exception):
+                ok, columns, error = False, {}, str(result)
+            else:
+                (ok, columns), error = result, None
+            failed = failed or not ok
+            self._emit(session, index, step['action'], start, ok=ok, page=schema.source.name,
+                       side=step['side'], lanes=list(chunk), values=columns,
+                       **({'error': error} if error else {}))
+        self.token.raise_if_cancelled()
+        if failed:
+            raise StepFailed()
+
+    def _lanes_op(self, method, step, chunk):
+        args = step['args']
+        if step['action'] == 'write':
+            args += (rows_to_columns(chunk, [step['values']] * len(chunk)),)
+        return method(step['side'], list(chunk), *args)
+
+    def _emit(self, session, index, action, start, **record):
+        self.output.emit(device=session.device, step=index, action=action,
+                         elapsed=round(time.perf_counter() - start, 6), **record)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run a register/operation script on devices without the GUI')
+    parser.add_argument('script', help="JSON/YAML script, '-' reads JSON from stdin")
+    parser.add_argument('--device', action='append', default=[],
+                        help='device to run on (repeatable); overrides the devices in the script')
+    parser.add_argument('--parallel', type=int, default=None,
+                        help='maximum number of devices run at the same time (default: all)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='concurrent transactions per device and side')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help=f'lanes per batched transaction (default {ScriptRunner.BATCH_SIZE})')
+    parser.add_argument('--latency', type=float, default=None,
+                        help='simulated GuiApi transaction delay in seconds')
+    parser.add_argument('--record', help='record every device call to this trace file')
+    parser.add_argument('--replay', help='answer device calls from this trace file')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='replay speed factor, 0 replays without delays')
+    parser.add_argument('--metrics', action='store_true',
+                        help='append the collected timing metrics to the output')
+    parser.add_argument('--no-snapshots', action='store_true',
+                        help='do not record register reads in the snapshot database')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.latency is not None:
+        GuiApi.TRANSACTION_DELAY = args.latency
+    if args.no_snapshots:
+        snapshot_store.enabled = False
+    environ = {}
+    if args.replay:
+        environ = {'GUI_TRACE_REPLAY': args.replay, 'GUI_TRACE_SPEED': args.speed}
+    elif args.record:
+        environ = {'GUI_TRACE_RECORD': args.record}
+    Operation.trace = trace.install_from_env(environ or os.environ)
+
+    script = load_script(args.script)
+    if isinstance(script, list):
+        script = {'steps': script}
+    output = JsonLinesOutput(sys.stdout)
+    runner = ScriptRunner(script.get('steps', []), output, args.workers, args.batch_size)
+    devices = args.device or script.get('devices') or [DEFAULT_DEVICE]
+
+    start = time.perf_counter()
+    # Operation 的打印输出转到 stderr，stdout 只输出 JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            results = runner.run(devices, args.parallel)
+        finally:
+            session_pool.close_all()
+            LaneExecutor.shutdown_all()
+            trace.shutdown()
+            snapshot_store.close()
+
+    summary = {status: sorted(device for device, result in results.items() if result == status)
+               for status in ('done', 'failed', 'cancelled')}
+    output.emit(summary=summary, elapsed=round(time.perf_counter() - start, 6))
+    if args.metrics:
+        output.emit(metrics=metrics.snapshot())
+    return 0 if not summary['failed'] and not summary['cancelled'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
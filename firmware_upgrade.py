@@ -0,0 +1,193 @@
+import mmap
+import os
+import threading
+import time
+import zlib
+from contextlib import closing, nullcontext
+
+from api import cancel_token
+
+
+class TransportError(Exception):
+    """A chunk could not be delivered to the device"""
+
+
+class FirmwareImage:
+    """Read-only, memory-mapped view of a firmware image file"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self.size = stat.st_size
+        # Identifies this image to the transport, so a partial transfer is only
+        # resumed with the same file; cheap enough to compute before sending
+        self.image_id = f'{os.path.realpath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}'
+        # mmap cannot map an empty file
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+
+    def chunks(self, chunk_size, start=0):
+        """Yield (offset, memoryview) pairs from start to the end of the image"""
+        view = memoryview(self._map)
+        try:
+            for offset in range(start, self.size, chunk_size):
+                # Release each slice so the map can be closed even if the
+                # consumer still holds a reference (e.g. from a traceback)
+                with view[offset:offset + chunk_size] as chunk:
+                    yield offset, chunk
+        finally:
+            view.release()
+
+    def checksum(self, end, chunk_size=4 * 1024 * 1024):
+        """CRC32 of the first end bytes"""
+        crc = 0
+        with closing(self.chunks(chunk_size)) as chunks:
+            for offset, chunk in chunks:
+                if offset >= end:
+                    break
+                crc = zlib.crc32(chunk[:end - offset], crc)
+        return crc
+
+    def close(self):
+        if self.size:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MockTransport:
+    """Local stand-in for the device upgrade channel
+
+    The "device" only keeps the acknowledged offset and a running CRC of
+    the received bytes, so images of any size cost no memory. Use
+    bytes_per_second to simulate link speed and fail_at to inject a
+    one-shot TransportError once that offset is reached.
+    """
+
+    def __init__(self, bytes_per_second=None, fail_at=None):
+        self.bytes_per_second = bytes_per_second
+        self.fail_at = fail_at
+        self.image_size = None
+        self.image_id = None
+        self.acked_offset = 0
+        self._crc = 0
+        self._lock = threading.Lock()
+
+    def begin(self, image_size, resume=True, image_id=None):
+        """Start or resume a transfer, returning the offset to continue from
+
+        A partial transfer is only resumed for the same image (same size and
+        image_id); any other image starts from offset 0.
+        """
+        with self._lock:
+            if not resume or image_size != self.image_size or image_id != self.image_id:
+                self._reset()
+                self.image_size = image_size
+                self.image_id = image_id
+            return self.acked_offset
+
+    def send_chunk(self, offset, data):
+        """Send one chunk and return the new acknowledged offset"""
+        with self._lock:
+            if offset != self.acked_offset:
+                raise TransportError(f"out of order chunk at {offset}, expected {self.acked_offset}")
+            if self.fail_at is not None and offset + len(data) > self.fail_at:
+                self.fail_at = None
+                raise TransportError(f"link dropped at offset {offset}")
+        if self.bytes_per_second:
+            cancel_token.sleep(len(data) / self.bytes_per_second)
+        with self._lock:
+            self._crc = zlib.crc32(data, self._crc)
+            self.acked_offset = offset + len(data)
+            return self.acked_offset
+
+    def finish(self, checksum):
+        """Commit the image; the device verifies the whole-image CRC"""
+        with self._lock:
+            ok = self.acked_offset == self.image_size and self._crc == checksum
+            # Committed or rejected, the partial image is discarded either way
+            self._reset()
+            return ok
+
+    def _reset(self):
+        self.image_size = None
+        self.image_id = None
+        self.acked_offset = 0
+        self._crc = 0
+
+
+class FirmwareUpgrader:
+    """Streams a firmware image to a transport chunk by chunk
+
+    The image is memory-mapped instead of loaded, the CRC is computed while
+    sending, and after a TransportError the transfer resumes from the last
+    offset the device acknowledged. Each transport call runs inside its own
+    transaction() context, so a long upgrade does not hold the device
+    between chunks.
+    """
+    CHUNK_SIZE = 1024 * 1024
+    MAX_RETRIES = 3
+    PROGRESS_INTERVAL = 0.1  # seconds between progress callbacks
+
+    def __init__(self, transport, chunk_size=None, max_retries=None, progress=None,
+                 transaction=None):
+        self.transport = transport
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.max_retries = self.MAX_RETRIES if max_retries is None else max_retries
+        # progress(sent_bytes, total_bytes, bytes_per_second)
+        self.progress = progress
+        # transaction() -> context manager around one device I/O step
+        self.transaction = transaction or nullcontext
+
+    def upgrade(self, file_path, resume=True):
+        """Send the image and commit it; returns the image CRC32"""
+        with FirmwareImage(file_path) as image:
+            retries = 0
+            while True:
+                try:
+                    crc = self._send(image, resume)
+                    break
+                except TransportError:
+                    retries += 1
+                    if retries > self.max_retries:
+                        raise
+                    resume = True
+
+            with self.transaction():
+                accepted = self.transport.finish(crc)
+            if not accepted:
+                raise TransportError("device rejected image checksum")
+            return crc
+
+    def _send(self, image, resume):
+        with self.transaction():
+            offset = self.transport.begin(image.size, resume, image.image_id)
+        # Bytes the device already holds only need to be checksummed locally
+        crc = image.checksum(offset)
+
+        start_time = last_report = time.monotonic()
+        start_offset = offset
+        self._report(offset, image.size, 0.0)
+        with closing(image.chunks(self.chunk_size, offset)) as chunks:
+            for chunk_offset, chunk in chunks:
+                cancel_token.check()
+                with self.transaction():
+                    offset = self.transport.send_chunk(chunk_offset, chunk)
+                crc = zlib.crc32(chunk, crc)
+
+                now = time.monotonic()
+                if now - last_report >= self.PROGRESS_INTERVAL or offset == image.size:
+                    last_report = now
+                    elapsed = now - start_time
+                    rate = (offset - start_offset) / elapsed if elapsed > 0 else 0.0
+                    self._report(offset, image.size, rate)
+        return crc
+
+    def _report(self, sent, total, rate):
+        if self.progress:
+            self.progress(sent, total, rate)
@@ -0,0 +1,170 @@
+import gzip
+import itertools
+import os
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+from api import cancel_token
+from api.app_dirs import user_data_dir
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def read_device_log(total_bytes=16 * 1024 * 1024, chunk_size=256 * 1024, bytes_per_second=None,
+                    transaction=None):
+    """Pull the device log in chunks (simulated)
+
+    Yields bytes objects of about chunk_size, always ending on a line
+    boundary. The real backend would read from the device here. Each chunk
+    is read inside its own transaction() context, which is released before
+    the chunk is yielded.
+    """
+    transaction = transaction or nullcontext
+    counter = itertools.count()
+    sent = 0
+    while sent < total_bytes:
+        cancel_token.check()
+        with transaction():
+            stamp = time.strftime('%H:%M:%S')
+            lines = []
+            size = 0
+            while size < chunk_size and sent + size < total_bytes:
+                n = next(counter)
+                line = f"{stamp}.{n % 1000:03d} [lane{n % 8}] reg 0x{n * 4 & 0xffff:04x} = 0x{n * 2654435761 & 0xffffffff:08x}\n"
+                lines.append(line)
+                size += len(line)
+            chunk = ''.join(lines).encode()
+            if bytes_per_second:
+                cancel_token.sleep(len(chunk) / bytes_per_second)
+        sent += len(chunk)
+        yield chunk
+
+
+def default_log_dir():
+    """Where exported logs go when no output directory is given
+
+    GUI_LOG_DIR overrides it; otherwise device_logs under the user data
+    directory (see api.app_dirs), independent of the working directory.
+    """
+    path = os.environ.get('GUI_LOG_DIR')
+    if path:
+        return Path(path)
+    return user_data_dir() / 'device_logs'
+
+
+def default_compression():
+    return 'zstd' if zstandard is not None else 'gzip'
+
+
+class RotatingCompressedWriter:
+    """Writes a byte stream to compressed files, rotating by compressed size
+
+    Files are named <base>.001.log.gz, <base>.002.log.gz, ... and every file
+    is a complete stream that can be decompressed on its own.
+    """
+    SUFFIX = {'gzip': '.log.gz', 'zstd': '.log.zst', 'none': '.log'}
+
+    def __init__(self, base_path, max_bytes=64 * 1024 * 1024, compression=None):
+        compression = compression or default_compression()
+        if compression not in self.SUFFIX:
+            raise ValueError(f"unknown compression {compression!r}")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        self.base_path = Path(base_path)
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.files = []
+        self.bytes_in = 0
+        self._raw = None
+        self._stream = None
+
+    def write(self, data):
+        if self._stream is None or self._raw.tell() >= self.max_bytes:
+            self._rotate()
+        self._stream.write(data)
+        self.bytes_in += len(data)
+
+    def bytes_out(self):
+        """Compressed bytes written so far (as reported by the file sizes)"""
+        return sum(os.path.getsize(path) for path in self.files)
+
+    def _open_stream(self, raw):
+        if self.compression == 'gzip':
+            return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False)
+        return raw
+
+    def _rotate(self):
+        self._close_current()
+        path = self.base_path.with_name(
+            f"{self.base_path.name}.{len(self.files) + 1:03d}{self.SUFFIX[self.compression]}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._raw = open(path, 'wb')
+        self._stream = self._open_stream(self._raw)
+        self.files.append(path)
+
+    def _close_current(self):
+        if self._stream is not None and self._stream is not self._raw:
+            self._stream.close()
+        if self._raw is not None:
+            self._raw.close()
+        self._raw = self._stream = None
+
+    def close(self):
+        self._close_current()
+
+    def discard(self):
+        """Close and delete everything written so far"""
+        self._close_current()
+        for path in self.files:
+            path.unlink(missing_ok=True)
+        self.files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_log(chunks, base_path, max_bytes=64 * 1024 * 1024, compression=None,
+               preview=None, preview_lines=20, progress=None, progress_interval=0.1):
+    """Stream log chunks into rotating compressed files
+
+    Only the current chunk is held in memory. The first preview_lines lines
+    are passed to preview(line); progress(bytes_in, None, bytes_per_second)
+    is called periodically. Returns the writer, whose files attribute lists
+    the written files. When the export is cancelled or fails, the partially
+    written files are deleted.
+    """
+    remaining_preview = preview_lines if preview else 0
+    start_time = last_report = time.monotonic()
+    writer = RotatingCompressedWriter(base_path, max_bytes, compression)
+    try:
+        for chunk in chunks:
+            cancel_token.check()
+            writer.write(chunk)
+
+            if remaining_preview:
+                for line in chunk.decode(errors='replace').splitlines()[:remaining_preview]:
+                    preview(line)
+                    remaining_preview -= 1
+
+            now = time.monotonic()
+            if progress and now - last_report >= progress_interval:
+                last_report = now
+                progress(writer.bytes_in, None, writer.bytes_in / (now - start_time))
+    except BaseException:
+        writer.discard()
+        raise
+    writer.close()
+
+    if progress:
+        elapsed = time.monotonic() - start_time
+        progress(writer.bytes_in, None, writer.bytes_in / elapsed if elapsed > 0 else 0.0)
+    return writer
@@ -1,11 +1,20 @@
 from PySide6.QtWidgets import (QApplication, QMainWindow, QPushButton,
                                QVBoxLayout, QHBoxLayout, QWidget,
                                QLineEdit, QFileDialog, QGroupBox, QComboBox,
-                               QPlainTextEdit, QSplitter)
+                               QPlainTextEdit, QSplitter, QLabel)
 from PySide6.QtCore import Qt
+import os
 import sys
-from operation import OperationWorker
+from scheduler import OperationScheduler
+from api.device_session import session_pool
+from api.snapshot_store import snapshot_store
+from api import trace
+from operation import Operation
 from progress_indicator import ProgressIndicator
+from widgets.job_list import JobListWidget
+from widgets.stats_panel import StatsPanel
+from widgets.utils.lane_executor import LaneExecutor
+from widgets.utils.log_sink import LogSink
 from pathlib import Path
 
 
@@ -15,15 +24,16 @@ class MainWindow(QMainWindow):
         ("Debug", 2),
         ("Test", 3)
     ]
+    devices = ["Board A", "Board B"]
 
     def __init__(self):
         super().__init__()
+        self.scheduler = OperationScheduler(self)
         self.load_styles()
         self.init_window()
         self.init_ui()
         self.init_signals()
         self.init_loading_spinner()
-        self.worker = None
 
     def init_window(self):
         self.setWindowTitle("我的应用")
@@ -43,6 +53,7 @@ class MainWindow(QMainWindow):
         upper_layout = QVBoxLayout()
         upper_layout.setSpacing(80)
         upper_layout.setContentsMargins(20, 50, 20, 50)
+        upper_layout.addLayout(self.create_device_layout())
         upper_layout.addLayout(top_layout)
         upper_layout.addLayout(middle_layout)
         upper_widget = QWidget()
@@ -62,6 +73,18 @@ class MainWindow(QMainWindow):
         # 添加到主布局
         self.main_layout.addWidget(spliter)
 
+    def create_device_layout(self):
+        self.device_select = QComboBox()
+        self.device_select.addItems(self.devices)
+        self.device_select.setProperty("type", "combobox")
+        self.device_select.setFixedHeight(40)
+
+        device_layout = QHBoxLayout()
+        device_layout.addWidget(QLabel("Device"))
+        device_layout.addWidget(self.device_select)
+        device_layout.addStretch()
+        return device_layout
+
     def create_top_layout(self):
         reset_group = self.create_reset_group()
         upgrade_group = self.create_upgrade_group()
@@ -98,6 +121,11 @@ class MainWindow(QMainWindow):
         upgrade_btn.setObjectName("upgrade")
         upgrade_btn.setProperty("type", "square")
 
+        # 升级 -> 芯片复位 -> 设置工作模式，前一步成功后才执行下一步
+        upgrade_chain_btn = QPushButton("UPGRADE\n+ RESET\n+ MODE")
+        upgrade_chain_btn.setObjectName("upgrade_chain")
+        upgrade_chain_btn.setProperty("type", "square")
+
         self.file_input = QLineEdit()
         self.file_input.setProperty("type", "file_input")
         self.file_input.setReadOnly(True)
@@ -118,6 +146,7 @@ class MainWindow(QMainWindow):
         upgrade_layout.setSpacing(20)
         upgrade_layout.setContentsMargins(20, 20, 20, 20)
         upgrade_layout.addWidget(upgrade_btn)
+        upgrade_layout.addWidget(upgrade_chain_btn)
         upgrade_layout.addLayout(file_select_layout)
 
         upgrade_group = QGroupBox("")
@@ -186,17 +215,28 @@ class MainWindow(QMainWindow):
         self.log_output = QPlainTextEdit()
         self.log_output.setReadOnly(True)
         self.log_output.setMinimumHeight(200)
-
-        bottom_layout.addWidget(self.log_output)
+        # 设置 GUI_LOG_SPILL 时，被挤出输出框的旧日志写入该文件（按大小轮转）
+        self.log_sink = LogSink(self.log_output, spill_path=os.environ.get('GUI_LOG_SPILL'))
+        self.scheduler.log_message.connect(self.log_sink.write, Qt.DirectConnection)
+
+        # 作业列表
+        self.job_list = JobListWidget(self.scheduler)
+        # 操作耗时统计
+        self.stats_panel = StatsPanel()
+
+        log_splitter = QSplitter()
+        log_splitter.setOrientation(Qt.Orientation.Horizontal)
+        log_splitter.addWidget(self.job_list)
+        log_splitter.addWidget(self.log_output)
+        log_splitter.addWidget(self.stats_panel)
+        log_splitter.setSizes([500, 600, 400])
+
+        bottom_layout.addWidget(log_splitter)
         return bottom_layout
 
     def log_message(self, message):
-        """添加日志消息到输出框"""
-        self.log_output.appendPlainText(message)
-        # 滚动到底部
-        self.log_output.verticalScrollBar().setValue(
-            self.log_output.verticalScrollBar().maximum()
-        )
+        """添加日志消息到输出框（批量刷新，可在任意线程调用）"""
+        self.log_sink.write(message)
 
     def init_signals(self):
         # 连接所有信号
@@ -206,12 +246,11 @@ class MainWindow(QMainWindow):
             lambda: self.start_operation("chip_reset"))
         self.findChild(QPushButton, "upgrade").clicked.connect(
             lambda: self.start_operation("upgrade", file_path=self.file_input.text()))
+        self.findChild(QPushButton, "upgrade_chain").clicked.connect(self.start_upgrade_chain)
         self.findChild(QPushButton, "dump_log").clicked.connect(
             lambda: self.start_operation("dump_log"))
         self.findChild(QPushButton, "work_mode").clicked.connect(
-            lambda: self.start_operation("work_mode",
-                                         mode_label=self.mode_select.currentText(),
-                                         mode_value=self.work_modes[self.mode_select.currentIndex()][1]))
+            lambda: self.start_operation("work_mode", **self.selected_work_mode()))
         self.findChild(QPushButton, "file_select").clicked.connect(
             self.select_file)
 
@@ -241,37 +280,53 @@ class MainWindow(QMainWindow):
              self.progress_indicator.height()) // 2
         )
 
+        # 取消按钮
+        self.cancel_btn = QPushButton("Cancel", self.loading_container)
+        self.cancel_btn.setFixedWidth(80)
+        self.cancel_btn.move(
+            (self.loading_container.width() - self.cancel_btn.width()) // 2,
+            self.progress_indicator.y() + self.progress_indicator.height() + 8
+        )
+        self.cancel_btn.clicked.connect(self.cancel_operation)
+
         # 初始状态为隐藏
         self.loading_container.hide()
+        self.scheduler.busy_changed.connect(self.on_busy_changed)
 
     def start_operation(self, operation_type, **kwargs):
-        # 禁用所有控件
-        self.setEnabled(False)
-
-        # 显示加载动画
-        self.loading_container.move(
-            (self.width() - self.loading_container.width()) // 2,
-            (self.height() - self.loading_container.height()) // 2
-        )
-        self.loading_container.show()
-        self.progress_indicator.start()
-
-        # 创建并启动工作线程
-        self.worker = OperationWorker(operation_type, **kwargs)
-        self.worker.finished.connect(self.on_operation_finished)
-        self.worker.log_message.connect(self.log_message)
-        self.worker.start()
-
-    def on_operation_finished(self):
-        # 停止加载动画
-        self.progress_indicator.stop()
-        self.loading_container.hide()
-
-        # 启用所有控件
-        self.setEnabled(True)
-
-        # 清理工作线程
-        self.worker = None
+        """把操作提交给调度器，界面不会被阻塞"""
+        self.scheduler.submit(operation_type, self.device_select.currentText(), **kwargs)
+
+    def start_upgrade_chain(self):
+        """升级、芯片复位、设置工作模式依次执行，任一步失败或取消时后续步骤不再执行"""
+        self.scheduler.submit_chain(self.device_select.currentText(), [
+            ("upgrade", {"file_path": self.file_input.text()}),
+            ("chip_reset", {}),
+            ("work_mode", self.selected_work_mode()),
+        ])
+
+    def selected_work_mode(self):
+        label, value = self.work_modes[self.mode_select.currentIndex()]
+        return {"mode_label": label, "mode_value": value}
+
+    def on_busy_changed(self, busy):
+        """有作业运行时显示加载动画"""
+        if busy:
+            self.loading_container.move(
+                (self.width() - self.loading_container.width()) // 2,
+                (self.height() - self.loading_container.height()) // 2
+            )
+            self.loading_container.show()
+            self.progress_indicator.start()
+        else:
+            self.progress_indicator.stop()
+            self.loading_container.hide()
+
+    def cancel_operation(self):
+        """取消所有排队和运行中的作业，运行中的作业在下一个检查点退出"""
+        if self.scheduler.active_jobs():
+            self.scheduler.cancel_all()
+            self.log_message("Cancelling...")
 
     def load_styles(self):
         """加载QSS样式表"""
@@ -282,7 +337,16 @@ class MainWindow(QMainWindow):
 
 def main():
     app = QApplication(sys.argv)
+    # GUI_TRACE_RECORD / GUI_TRACE_REPLAY 环境变量启用录制或回放
+    Operation.trace = trace.install_from_env()
     window = MainWindow()
+    app.aboutToQuit.connect(window.scheduler.shutdown)
+    app.aboutToQuit.connect(LaneExecutor.shutdown_all)
+    app.aboutToQuit.connect(session_pool.close_all)
+    app.aboutToQuit.connect(trace.shutdown)
+    # 后台写入线程中尚未落盘的读数在退出前写完
+    app.aboutToQuit.connect(snapshot_store.close)
+    app.aboutToQuit.connect(window.log_sink.close)
     window.show()
     sys.exit(app.exec())
 
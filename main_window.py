@@ -1,13 +1,54 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout,
                                QHBoxLayout, QPushButton, QTabWidget, QTabBar)
 from widgets.utils.progress_indicator import QProgressIndicator
-from widgets.table_one import TableOne
-from widgets.table_two import TableTwo
-from widgets.table_three import TableThree
+import importlib
+import os
 import sys
+from pathlib import Path
 from PySide6.QtWidgets import QApplication
 
 
+# 页面注册表：(按钮文字, 标签页标题, 工厂函数)
+# 页面在第一次打开时才创建，页面模块（以及它依赖的设备后端）也在那时才导入
+PAGES = []
+
+
+def register_page(button_text, tab_title, factory):
+    PAGES.append((button_text, tab_title, factory))
+
+
+def lazy_page(module_name, class_name, *args, **kwargs):
+    """返回一个在调用时才导入 module_name 并创建 class_name(*args, **kwargs) 的工厂"""
+    def factory():
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)(*args, **kwargs)
+    return factory
+
+
+register_page("功能1", "表格 1", lazy_page('widgets.table_one', 'TableOne'))
+register_page("功能2", "表格 2", lazy_page('widgets.table_two', 'TableTwo', 'Host Side'))
+register_page("功能3", "表格 3", lazy_page('widgets.table_three', 'TableThree', 'Line Side'))
+register_page("统计", "统计", lazy_page('widgets.stats_panel', 'StatsPanel'))
+register_page("快照", "快照对比", lazy_page('widgets.snapshot_view', 'SnapshotDiffView'))
+
+
+def register_schema_pages(directory):
+    """为目录中的每个页面声明文件注册一个 RegisterPage，以文件名作为按钮文字
+
+    启动时只列出文件，声明文件在页面第一次打开时才解析。
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return
+    for path in sorted(directory.iterdir()):
+        if path.suffix in ('.yaml', '.yml', '.json'):
+            register_page(path.stem, path.stem,
+                          lazy_page('widgets.register_page', 'RegisterPage', str(path)))
+
+
+register_schema_pages(Path(__file__).parent / 'schemas' / 'pages')
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -29,17 +70,13 @@ class MainWindow(QMainWindow):
         button_page = QWidget()
         button_layout = QHBoxLayout(button_page)
 
-        # 创建按钮
-        self.btn1 = QPushButton("功能1")
-        self.btn2 = QPushButton("功能2")
-        self.btn3 = QPushButton("功能3")
-        self.buttons = [self.btn1, self.btn2, self.btn3]
+        # 每个注册的页面一个按钮
+        self.buttons = [QPushButton(button_text) for button_text, _, _ in PAGES]
 
         # 添加按钮到布局
         button_layout.addStretch()
-        button_layout.addWidget(self.btn1)
-        button_layout.addWidget(self.btn2)
-        button_layout.addWidget(self.btn3)
+        for button in self.buttons:
+            button_layout.addWidget(button)
         button_layout.addStretch()
 
         # 添加按钮页为第一个标签页
@@ -48,11 +85,8 @@ class MainWindow(QMainWindow):
         # 禁用第一个标签页的关闭按钮
         self.tab_widget.tabBar().setTabButton(0, QTabBar.ButtonPosition.RightSide, None)
 
-        # 创建表格页
-        self.table_one = TableOne()
-        self.table_two = TableTwo('Host Side')
-        self.table_three = TableThree('Line Side')
-        self.tables = [self.table_one, self.table_two, self.table_three]
+        # 已创建的页面，index -> widget
+        self.pages = {}
 
         # 创建加载指示器
         self.spinner = QProgressIndicator(self)
@@ -64,27 +98,36 @@ class MainWindow(QMainWindow):
 
     def setup_connections(self):
         """设置信号连接"""
-        self.btn1.clicked.connect(lambda: self.open_table_tab(0))
-        self.btn2.clicked.connect(lambda: self.open_table_tab(1))
-        self.btn3.clicked.connect(lambda: self.open_table_tab(2))
+        for index, button in enumerate(self.buttons):
+            button.clicked.connect(lambda checked=False, index=index: self.open_table_tab(index))
         self.tab_widget.tabCloseRequested.connect(self.close_tab)
 
+    def page(self, index: int):
+        """返回 index 对应的页面，第一次访问时才创建"""
+        page = self.pages.get(index)
+        if page is None:
+            page = self.pages[index] = PAGES[index][2]()
+        return page
+
     def open_table_tab(self, index: int):
         """打开表格标签页"""
+        page = self.page(index)
         # 检查该表格页是否已经打开
         for i in range(self.tab_widget.count()):
-            if self.tab_widget.widget(i) == self.tables[index]:
+            if self.tab_widget.widget(i) == page:
                 self.tab_widget.setCurrentIndex(i)
                 return
 
         # 如果未打开，添加新标签页
-        tab_title = f"表格 {index + 1}"
-        self.tab_widget.addTab(self.tables[index], tab_title)
+        tab_title = PAGES[index][1]
+        self.tab_widget.addTab(page, tab_title)
         tab_index = self.tab_widget.count() - 1
         self.tab_widget.setCurrentIndex(tab_index)
 
-        # # 修改这里，直接调用表格的加载方法
-        self.tables[index].load_data()
+        # 没有数据源的页面（如 TableOne）不需要加载
+        load_data = getattr(page, 'load_data', None)
+        if load_data is not None:
+            load_data()
 
     def close_tab(self, index: int):
         """关闭标签页"""
@@ -102,9 +145,39 @@ class MainWindow(QMainWindow):
             )
 
 
+def shutdown_backends():
+    """退出时停止已加载的设备后端；从未用到的后端不会为此被导入"""
+    thread_module = sys.modules.get('widgets.utils.device_oper_thread')
+    if thread_module is not None:
+        thread_module.DeviceOperThread.cancel_all()
+    executor_module = sys.modules.get('widgets.utils.lane_executor')
+    if executor_module is not None:
+        # 设备操作线程已取消，池中的任务在下一个检查点退出，这里不等待
+        executor_module.LaneExecutor.shutdown_all()
+    loop_module = sys.modules.get('widgets.utils.async_loop')
+    if loop_module is not None:
+        loop_module.AsyncLoopThread.shutdown()
+    session_module = sys.modules.get('api.device_session')
+    if session_module is not None:
+        session_module.session_pool.close_all()
+    trace_module = sys.modules.get('api.trace')
+    if trace_module is not None:
+        trace_module.shutdown()
+    snapshot_module = sys.modules.get('api.snapshot_store')
+    if snapshot_module is not None:
+        snapshot_module.snapshot_store.close()
+
+
 def main():
     """程序入口函数"""
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(shutdown_backends)
+    # 只在需要录制/回放时才导入设备后端
+    if 'GUI_TRACE_RECORD' in os.environ or 'GUI_TRACE_REPLAY' in os.environ:
+        from api.trace import install_from_env
+        from operation import Operation
+        # 与 main.py 相同：操作也一起录制/回放
+        Operation.trace = install_from_env()
     window = MainWindow()
     window.show()
     sys.exit(app.exec())
@@ -1,73 +1,210 @@
 from PySide6.QtCore import QThread, Signal
+from api import cancel_token
+from api.cancel_token import CancelToken, OperationCancelled
+from api.device_session import session_pool
+from api.metrics import metrics
+from api.trace import TraceRecorder, TraceReplayer
+from firmware_upgrade import FirmwareUpgrader, MockTransport
+from log_export import default_log_dir, export_log, read_device_log
+from contextlib import nullcontext
+from pathlib import Path
 import time
 
 class OperationWorker(QThread):
     finished = Signal()  # 操作完成信号
     log_message = Signal(str)  # 添加日志信号
+    progress = Signal(object, object, float)  # 已发送字节, 总字节, 吞吐量(B/s)
     
-    def __init__(self, operation_type, **kwargs):
+    def __init__(self, operation_type, device=None, **kwargs):
         super().__init__()
         self.operation_type = operation_type
+        # 操作在该设备的会话中执行，与表格页共享连接和并发上限
+        self.session = session_pool.get(device)
         self.kwargs = kwargs
+        self.token = CancelToken()
+        # 执行结果：cancelled 表示被取消，error 为执行中抛出的异常
+        self.cancelled = False
+        self.error = None
+
+    def cancel(self):
+        """Request cooperative cancellation of the running operation"""
+        self.token.cancel()
 
     def run(self):
-        if self.operation_type == "power_reset":
-            self.log_message.emit("Executing power reset...")
-            Operation.power_reset()
-            self.log_message.emit("Power reset completed\n")
-        elif self.operation_type == "chip_reset":
-            self.log_message.emit("Executing chip reset...")
-            Operation.chip_reset()
-            self.log_message.emit("Chip reset completed\n")
-        elif self.operation_type == "upgrade":
-            file_path = self.kwargs.get("file_path")
-            self.log_message.emit(f"Upgrading firmware with file {file_path}...")
-            Operation.upgrade(file_path)
-            self.log_message.emit("Upgrade firmware completed\n")
-        elif self.operation_type == "dump_log":
-            self.log_message.emit("Exporting logs...")
-            Operation.dump_log()
-            self.log_message.emit("Log export completed\n")
-        elif self.operation_type == "work_mode":
-            mode_label = self.kwargs.get("mode_label")
-            mode_value = self.kwargs.get("mode_value")
-            self.log_message.emit(f"Switching workmode to {mode_label}({mode_value})...")
-            Operation.set_work_mode(mode_label, mode_value)
-            self.log_message.emit(f"Workmode switched to: {mode_label}({mode_value})\n")
+        try:
+            Operation.run(self.operation_type, self.kwargs, self.session,
+                          log=self.log_message.emit, progress=self.progress.emit,
+                          token=self.token)
+        except OperationCancelled:
+            self.cancelled = True
+            self.log_message.emit("Operation cancelled\n")
+        except Exception as e:
+            self.error = e
+            self.log_message.emit(f"Operation {self.operation_type} failed: {e}\n")
         self.finished.emit()
 
 class Operation:
+    # Simulated device link; kept across calls so an interrupted upgrade can resume
+    upgrade_transport = MockTransport(bytes_per_second=20 * 1024 * 1024)
+    # Default directory for exported logs; None uses log_export.default_log_dir()
+    LOG_DIR = None
+    LOG_FILE_MAX_BYTES = 64 * 1024 * 1024
+    LOG_PREVIEW_LINES = 20
+    # Record or replay every operation (TraceRecorder/TraceReplayer, see api.trace);
+    # None runs operations directly
+    trace = None
+
+    @staticmethod
+    def run(operation_type, kwargs, session, log=print, progress=None, token=None):
+        """Run one operation on the device session
+
+        This is the Qt-free pipeline shared by OperationWorker and the headless
+        CLI. log(text) receives progress messages, progress is passed through
+        to long-running operations, and token makes the run cancellable.
+        Each device I/O step takes its own session transaction, so register
+        reads on the same device keep running during a long operation.
+        Returns what the operation returns (None when replayed). Raises
+        OperationCancelled when cancelled; other errors propagate.
+        """
+        with cancel_token.use_token(token), \
+                metrics.timed(f'Operation.{operation_type}', session.device):
+            return Operation._run_traced(operation_type, kwargs, log, progress,
+                                         session.device, session.transaction)
+
+    @staticmethod
+    def _run_traced(operation_type, kwargs, log, progress, device=None, transaction=None):
+        trace = Operation.trace
+        if isinstance(trace, TraceReplayer):
+            log(f"Replaying {operation_type}...")
+            trace.replay_operation(operation_type, kwargs)
+            log(f"{operation_type} replayed\n")
+            return
+        if not isinstance(trace, TraceRecorder):
+            return Operation.execute(operation_type, kwargs, log, progress, device, transaction)
+
+        start = time.monotonic()
+        error = None
+        try:
+            return Operation.execute(operation_type, kwargs, log, progress, device, transaction)
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            token = cancel_token.current_token()
+            if token is None or not token.cancelled:
+                trace.record_operation(operation_type, kwargs, start,
+                                       time.monotonic() - start, error)
+
+    @staticmethod
+    def execute(operation_type, kwargs, log=print, progress=None, device=None,
+                transaction=None):
+        """Dispatch operation_type to the matching operation below
+
+        device names the board the operation runs on; it keeps per-device
+        output such as exported logs apart. transaction() returns the context
+        each device I/O step runs in (DeviceSession.transaction); None runs
+        the steps without one.
+        """
+        if operation_type == "power_reset":
+            log("Executing power reset...")
+            Operation.power_reset(transaction)
+            log("Power reset completed\n")
+        elif operation_type == "chip_reset":
+            log("Executing chip reset...")
+            Operation.chip_reset(transaction)
+            log("Chip reset completed\n")
+        elif operation_type == "upgrade":
+            file_path = kwargs.get("file_path")
+            log(f"Upgrading firmware with file {file_path}...")
+            crc = Operation.upgrade(file_path, progress=progress,
+                                    resume=kwargs.get("resume", True),
+                                    transaction=transaction)
+            log(f"Upgrade firmware completed (CRC32 {crc:08x})\n")
+            return crc
+        elif operation_type == "dump_log":
+            log("Exporting logs...")
+            writer = Operation.dump_log(kwargs.get("output_dir"),
+                                        preview=lambda line: log(f"  {line}"),
+                                        device=device,
+                                        progress=progress,
+                                        transaction=transaction)
+            log(f"Log export completed: {writer.bytes_in} bytes -> {writer.bytes_out()} bytes "
+                f"in {len(writer.files)} file(s) under {writer.base_path.parent}\n")
+            return writer
+        elif operation_type == "work_mode":
+            mode_label = kwargs.get("mode_label")
+            mode_value = kwargs.get("mode_value")
+            log(f"Switching workmode to {mode_label}({mode_value})...")
+            Operation.set_work_mode(mode_label, mode_value, transaction)
+            log(f"Workmode switched to: {mode_label}({mode_value})\n")
+        else:
+            raise ValueError(f"Unknown operation {operation_type!r}")
+
     @staticmethod
-    def power_reset():
-        """Execute power reset operation"""
-        print("Executing power reset...")
-        time.sleep(5)  # Simulate 5 second delay
+    def power_reset(transaction=None):
+        """Execute power reset operation
+
+        Only sending the reset command occupies a device transaction; the
+        wait for the board to come back does not.
+        """
+        with (transaction or nullcontext)():
+            print("Executing power reset...")
+        cancel_token.sleep(5)  # Simulate 5 second delay
         print("Power reset completed")
 
     @staticmethod
-    def chip_reset():
-        """Execute chip reset operation"""
-        print("Executing chip reset...")
-        time.sleep(5)  # Simulate 5 second delay
+    def chip_reset(transaction=None):
+        """Execute chip reset operation (see power_reset for the transaction)"""
+        with (transaction or nullcontext)():
+            print("Executing chip reset...")
+        cancel_token.sleep(5)  # Simulate 5 second delay
         print("Chip reset completed")
 
     @staticmethod
-    def upgrade(file_path):
-        """Execute upgrade operation"""
+    def upgrade(file_path, progress=None, resume=True, transport=None, transaction=None):
+        """Execute upgrade operation, streaming the image in chunks
+
+        progress(sent_bytes, total_bytes, bytes_per_second) is called
+        periodically. Each chunk is sent in its own transaction(). Returns
+        the CRC32 of the image.
+        """
         print(f"Upgrading with file {file_path}...")
-        time.sleep(5)  # Simulate 5 second delay
+        upgrader = FirmwareUpgrader(transport or Operation.upgrade_transport, progress=progress,
+                                    transaction=transaction)
+        crc = upgrader.upgrade(file_path, resume=resume)
         print("Upgrade completed")
+        return crc
 
     @staticmethod
-    def dump_log():
-        """Execute log export operation"""
+    def dump_log(output_dir=None, preview=None, progress=None, device=None, transaction=None):
+        """Execute log export operation
+
+        The device log is streamed chunk by chunk into size-rotated compressed
+        files (zstd when available, otherwise gzip), so memory use does not
+        depend on the log size. The first lines go to preview(line). Files go
+        under output_dir/<device> when device is given. Each chunk is read
+        from the device in its own transaction().
+        Returns the RotatingCompressedWriter describing the written files.
+        """
         print("Exporting logs...")
-        time.sleep(5)  # Simulate 5 second delay
+        # One directory per device so parallel exports never share part files
+        log_dir = Path(output_dir or Operation.LOG_DIR or default_log_dir())
+        if device:
+            log_dir = log_dir / device
+        base_path = log_dir / time.strftime("dump_%Y%m%d_%H%M%S")
+        writer = export_log(read_device_log(transaction=transaction), base_path,
+                            max_bytes=Operation.LOG_FILE_MAX_BYTES,
+                            preview=preview, preview_lines=Operation.LOG_PREVIEW_LINES,
+                            progress=progress)
         print("Log export completed")
+        return writer
 
     @staticmethod
-    def set_work_mode(mode_label, mode_value):
-        """Set work mode"""
-        print(f"Switching to {mode_label} (Mode value: {mode_value})...")
-        time.sleep(5)  # Simulate 5 second delay
+    def set_work_mode(mode_label, mode_value, transaction=None):
+        """Set work mode (see power_reset for the transaction)"""
+        with (transaction or nullcontext)():
+            print(f"Switching to {mode_label} (Mode value: {mode_value})...")
+        cancel_token.sleep(5)  # Simulate 5 second delay
         print(f"Work mode switched to: {mode_label}")
@@ -0,0 +1,206 @@
+from PySide6.QtCore import QObject, Qt, Signal
+import itertools
+import time
+from operation import OperationWorker
+
+
+class Job:
+    """调度器中的一个设备操作"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, job_id, operation_type, device, kwargs, depends_on=()):
+        self.job_id = job_id
+        self.operation_type = operation_type
+        self.device = device
+        self.kwargs = kwargs
+        self.depends_on = list(depends_on)
+        self.status = Job.PENDING
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.worker = None
+        self.progress = None  # (已发送字节, 总字节, 吞吐量)，仅升级等长操作上报
+
+    @property
+    def finished(self):
+        return self.status in (Job.DONE, Job.FAILED, Job.CANCELLED)
+
+    def wait_time(self):
+        """排队等待的时长（秒）"""
+        return (self.started_at or self.finished_at or time.time()) - self.created_at
+
+    def run_time(self):
+        """执行时长（秒），尚未开始时为 None"""
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class OperationScheduler(QObject):
+    """设备操作调度器
+
+    - 按提交顺序排队，依赖的作业全部成功后才会开始；依赖失败或被取消时
+      该作业也被取消
+    - 每个设备同时运行的作业数不超过其并发上限（默认 1），不同设备之间
+      互不阻塞
+    - 已结束的作业最多保留 MAX_HISTORY 个，更早的从 jobs 中移除
+    """
+    job_added = Signal(object)
+    job_changed = Signal(object)
+    job_removed = Signal(object)
+    busy_changed = Signal(bool)
+    log_message = Signal(str)
+
+    DEFAULT_DEVICE_CONCURRENCY = 1
+    # 保留的已结束作业数，超出后移除最早结束的
+    MAX_HISTORY = 200
+    # 执行作业的线程类，接口同 OperationWorker（测试中可替换）
+    worker_class = OperationWorker
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = {}  # job_id -> Job，按提交顺序
+        self.device_limits = {}  # device -> 并发上限
+        self._ids = itertools.count(1)
+        self._busy = False
+        # 已发出 finished、但线程可能还没有完全退出的 worker；保留引用直到
+        # isFinished()，避免 QThread 在运行中析构，又不在 GUI 线程中等待
+        self._exiting = []
+
+    def set_device_limit(self, device, limit):
+        self.device_limits[device] = limit
+        self._schedule()
+
+    def submit(self, operation_type, device='default', depends_on=(), **kwargs):
+        """提交一个作业，depends_on 为需要先成功完成的 Job 或 job_id"""
+        depends_on = [dep.job_id if isinstance(dep, Job) else dep for dep in depends_on]
+        job = Job(next(self._ids), operation_type, device, kwargs, depends_on)
+        self.jobs[job.job_id] = job
+        self.job_added.emit(job)
+        self._schedule()
+        return job
+
+    def submit_chain(self, device, steps):
+        """提交一串依次依赖的作业，steps 为 [(operation_type, kwargs), ...]"""
+        jobs = []
+        for operation_type, kwargs in steps:
+            depends_on = jobs[-1:]
+            jobs.append(self.submit(operation_type, device, depends_on, **kwargs))
+        return jobs
+
+    def cancel(self, job_id):
+        """取消作业：排队中的直接取消，运行中的请求协作式取消"""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return
+        if job.status == Job.RUNNING:
+            job.worker.cancel()
+        else:
+            self._finish(job, Job.CANCELLED)
+            self._schedule()
+
+    def cancel_all(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def shutdown(self, wait_ms=3000):
+        """取消所有作业并等待运行中的线程退出（程序退出时调用）"""
+        self.cancel_all()
+        workers = [job.worker for job in self.jobs.values() if job.worker is not None]
+        for worker in workers + self._exiting:
+            worker.wait(wait_ms)
+
+    def active_jobs(self):
+        return [job for job in self.jobs.values() if not job.finished]
+
+    def _running_count(self, device):
+        return sum(1 for job in self.jobs.values()
+                   if job.device == device and job.status == Job.RUNNING)
+
+    def _schedule(self):
+        for job in list(self.jobs.values()):
+            if job.status != Job.PENDING:
+                continue
+
+            deps = [self.jobs.get(dep) for dep in job.depends_on]
+            if any(dep is None or dep.status in (Job.FAILED, Job.CANCELLED) for dep in deps):
+                self.log_message.emit(
+                    f"Job #{job.job_id} {job.operation_type} skipped: dependency did not complete\n")
+                self._finish(job, Job.CANCELLED)
+                continue
+            if not all(dep.status == Job.DONE for dep in deps):
+                continue
+
+            limit = self.device_limits.get(job.device, self.DEFAULT_DEVICE_CONCURRENCY)
+            if self._running_count(job.device) >= limit:
+                continue
+            self._start(job)
+
+        self._update_busy()
+
+    def _start(self, job):
+        job.worker = self.worker_class(job.operation_type, job.device, **job.kwargs)
+        # 多个作业并行时日志会交错，加上设备与作业号前缀
+        prefix = f"[{job.device} #{job.job_id}] "
+        job.worker.log_message.connect(
+            lambda message: self.log_message.emit(prefix + message), Qt.DirectConnection)
+        # 只在工作线程中记录最新进度，由作业列表的定时刷新负责显示
+        job.worker.progress.connect(
+            lambda sent, total, rate: setattr(job, 'progress', (sent, total, rate)),
+            Qt.DirectConnection)
+        job.worker.finished.connect(lambda: self._on_worker_finished(job))
+        job.status = Job.RUNNING
+        job.started_at = time.time()
+        self.job_changed.emit(job)
+        job.worker.start()
+
+    def _on_worker_finished(self, job):
+        worker = job.worker
+        if worker is None:
+            # 自定义 finished 与 QThread 自身的 finished 同名，槽会被调用两次
+            return
+        if worker.cancelled:
+            status = Job.CANCELLED
+        elif worker.error is not None:
+            status = Job.FAILED
+        else:
+            status = Job.DONE
+        job.worker = None
+        self._exiting = [exiting for exiting in self._exiting if not exiting.isFinished()]
+        self._exiting.append(worker)
+        self._finish(job, status)
+        self._schedule()
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        self.job_changed.emit(job)
+        self._prune_history()
+
+    def _prune_history(self):
+        """移除超出 MAX_HISTORY 的已结束作业，仍被未结束作业依赖的保留"""
+        finished = [job for job in self.jobs.values() if job.finished]
+        excess = len(finished) - self.MAX_HISTORY
+        if excess <= 0:
+            return
+        needed = {dep for job in self.jobs.values() if not job.finished
+                  for dep in job.depends_on}
+        finished.sort(key=lambda job: job.finished_at)
+        for job in finished:
+            if excess <= 0:
+                break
+            if job.job_id in needed:
+                continue
+            del self.jobs[job.job_id]
+            self.job_removed.emit(job)
+            excess -= 1
+
+    def _update_busy(self):
+        busy = any(job.status == Job.RUNNING for job in self.jobs.values())
+        if busy != self._busy:
+            self._busy = busy
+            self.busy_changed.emit(busy)
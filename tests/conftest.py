@@ -0,0 +1,16 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 测试直接导入仓库根目录下的模块
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """GUI 相关的测试共用一个 QApplication（无显示环境时使用 offscreen）"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
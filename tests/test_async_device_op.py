@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+
+from PySide6.QtCore import Qt
+
+from api import cancel_token
+from api.gui_api import rows_to_columns
+from widgets.utils.async_device_op import AsyncDeviceOp
+
+
+class SyncApi:
+    """同步接口（如 DeviceSession.cache），在线程池中执行"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.running = 0
+        self.exited = threading.Event()
+
+    def getDriver(self, side, lane):
+        self.running += 1
+        try:
+            cancel_token.sleep(self.delay)
+            return True, {'mode': lane}
+        finally:
+            self.running -= 1
+            self.exited.set()
+
+    def getDriverLanes(self, side, lanes):
+        return True, rows_to_columns(lanes, [{'mode': lane} for lane in lanes])
+
+
+class AsyncApi:
+    def __init__(self):
+        self.running = 0
+
+    async def getDriver(self, side, lane):
+        self.running += 1
+        try:
+            await asyncio.sleep(10)
+        finally:
+            self.running -= 1
+
+
+def start(op):
+    results, finished = [], threading.Event()
+    op.results_ready.connect(results.extend, Qt.DirectConnection)
+    op.finished.connect(finished.set, Qt.DirectConnection)
+    op.start()
+    return results, finished
+
+
+def test_sync_api_results(qapp):
+    op = AsyncDeviceOp('getDriver', 'Host Side', list(range(20)), api=SyncApi(), batch_size=8)
+    results, finished = start(op)
+    assert finished.wait(5)
+    assert sorted(lane for _, lane, _ in results) == list(range(20))
+    assert all(ret and row == {'mode': lane} for ret, lane, row in results)
+
+
+def test_cancel_finishes_after_sync_calls_exit(qapp):
+    api = SyncApi(delay=10)
+    op = AsyncDeviceOp('getDriver', 'Host Side', [0], api=api)
+    running_at_finish = []
+    op.finished.connect(lambda: running_at_finish.append(api.running), Qt.DirectConnection)
+    results, finished = start(op)
+    while not api.running:
+        time.sleep(0.01)
+    op.cancel()
+    assert finished.wait(2)
+    assert api.exited.is_set() and running_at_finish == [0]
+    assert results == []
+
+
+def test_cancel_finishes_after_tasks_unwind(qapp):
+    api = AsyncApi()
+    op = AsyncDeviceOp('getDriver', 'Host Side', [0, 1, 2], api=api)
+    running_at_finish = []
+    op.finished.connect(lambda: running_at_finish.append(api.running), Qt.DirectConnection)
+    _, finished = start(op)
+    while api.running < 3:
+        time.sleep(0.01)
+    op.cancel()
+    assert finished.wait(2)
+    assert running_at_finish == [0]
+    assert op.wait(100)
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from api.cancel_token import CancelToken, OperationCancelled, use_token
+from api.device_session import DeviceSession
+
+
+class FakeConnection:
+    def ping(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class FakeApi:
+    @staticmethod
+    def open_connection(device):
+        return FakeConnection()
+
+
+def wait_for_slot(session, token, outcome):
+    with use_token(token):
+        try:
+            with session.transaction():
+                outcome.append('acquired')
+        except OperationCancelled:
+            outcome.append('cancelled')
+
+
+def test_cancel_wakes_a_waiting_transaction():
+    session = DeviceSession('dev', FakeApi, max_transactions=1)
+    token, outcome = CancelToken(), []
+    with session.transaction():
+        waiter = threading.Thread(target=wait_for_slot, args=(session, token, outcome))
+        waiter.start()
+        time.sleep(0.05)
+        start = time.monotonic()
+        token.cancel()
+        waiter.join(1)
+        assert outcome == ['cancelled']
+        assert time.monotonic() - start < 0.5
+    # 取消的等待者不占用名额
+    with session.transaction():
+        pass
+
+
+def test_release_hands_the_slot_to_a_waiter():
+    session = DeviceSession('dev', FakeApi, max_transactions=1)
+    outcome = []
+    with session.transaction():
+        waiter = threading.Thread(target=wait_for_slot, args=(session, CancelToken(), outcome))
+        waiter.start()
+        time.sleep(0.05)
+        assert outcome == []
+    waiter.join(1)
+    assert outcome == ['acquired']
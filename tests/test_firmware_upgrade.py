@@ -0,0 +1,114 @@
+import os
+import zlib
+from contextlib import contextmanager
+
+import pytest
+
+from firmware_upgrade import FirmwareUpgrader, MockTransport, TransportError
+
+CHUNK = 1024
+
+
+def write_image(path, seed, size=8 * CHUNK):
+    data = bytes((seed + i * 7) % 256 for i in range(size))
+    path.write_bytes(data)
+    return data
+
+
+def upgrade(transport, path, **kwargs):
+    sent = []
+    upgrader = FirmwareUpgrader(transport, chunk_size=CHUNK, max_retries=0,
+                                progress=lambda done, total, rate: sent.append(done), **kwargs)
+    crc = upgrader.upgrade(str(path))
+    return crc, sent
+
+
+def interrupt(transport, path, at):
+    transport.fail_at = at
+    with pytest.raises(TransportError):
+        upgrade(transport, path)
+
+
+def test_resume_after_drop(tmp_path):
+    image = tmp_path / 'a.bin'
+    data = write_image(image, 1)
+    transport = MockTransport()
+
+    interrupt(transport, image, 3 * CHUNK)
+    assert transport.acked_offset == 3 * CHUNK
+
+    crc, sent = upgrade(transport, image)
+    assert sent[0] == 3 * CHUNK
+    assert crc == zlib.crc32(data)
+    assert transport.acked_offset == 0
+
+
+def test_retry_resumes_within_one_upgrade(tmp_path):
+    image = tmp_path / 'a.bin'
+    data = write_image(image, 2)
+    transport = MockTransport(fail_at=5 * CHUNK)
+
+    crc = FirmwareUpgrader(transport, chunk_size=CHUNK, max_retries=1).upgrade(str(image))
+    assert crc == zlib.crc32(data)
+
+
+def test_different_image_does_not_resume(tmp_path):
+    first, second = tmp_path / 'a.bin', tmp_path / 'b.bin'
+    write_image(first, 1)
+    data = write_image(second, 99)
+    transport = MockTransport()
+
+    interrupt(transport, first, 3 * CHUNK)
+    crc, sent = upgrade(transport, second)
+    assert sent[0] == 0
+    assert crc == zlib.crc32(data)
+
+
+def test_rewritten_image_does_not_resume(tmp_path):
+    image = tmp_path / 'a.bin'
+    write_image(image, 1)
+    transport = MockTransport()
+
+    interrupt(transport, image, 3 * CHUNK)
+    data = write_image(image, 42)
+    stat = image.stat()
+    os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    crc, sent = upgrade(transport, image)
+    assert sent[0] == 0
+    assert crc == zlib.crc32(data)
+
+
+def test_checksum_rejection_resets_transport(tmp_path):
+    image = tmp_path / 'a.bin'
+    data = write_image(image, 3)
+    transport = MockTransport()
+
+    transport.begin(len(data))
+    transport.send_chunk(0, data)
+    assert transport.finish(zlib.crc32(data) ^ 1) is False
+    assert transport.acked_offset == 0 and transport.image_size is None
+
+    # The next upgrade starts over and succeeds
+    crc, sent = upgrade(transport, image)
+    assert sent[0] == 0
+    assert crc == zlib.crc32(data)
+
+
+def test_each_transport_call_has_its_own_transaction(tmp_path):
+    image = tmp_path / 'fw.bin'
+    write_image(image, 5)
+    active, steps = [], []
+
+    @contextmanager
+    def transaction():
+        assert not active
+        active.append(1)
+        try:
+            yield
+        finally:
+            active.pop()
+            steps.append(1)
+
+    upgrade(MockTransport(), image, transaction=transaction)
+    # begin + 8 chunks + finish
+    assert len(steps) == 10
@@ -0,0 +1,34 @@
+import asyncio
+
+from api.async_gui_api import AsyncGuiApi
+from api.gui_api import GuiApi
+
+DATA = {'driver_mode': [1, None, 3], 'prop_6': [None, None, 7]}
+
+
+def record_writes(monkeypatch, api, is_async=False):
+    writes = []
+    monkeypatch.setattr(GuiApi, 'TRANSACTION_DELAY', 0)
+
+    def write(cls, side, lane, key, value):
+        writes.append((lane, key, value))
+
+    async def async_write(cls, side, lane, key, value):
+        write(cls, side, lane, key, value)
+
+    monkeypatch.setattr(api, '_write_register', classmethod(async_write if is_async else write))
+    return writes
+
+
+def test_batched_write_skips_none(monkeypatch):
+    writes = record_writes(monkeypatch, GuiApi)
+    monkeypatch.setattr(GuiApi, 'CONNECT_DELAY', 0)
+    ret, written = GuiApi.setDriverLanes('Host Side', [0, 1, 2], DATA)
+    assert ret is True and written['lane'] == [0, 1, 2]
+    assert sorted(writes) == [(0, 'driver_mode', 1), (2, 'driver_mode', 3), (2, 'prop_6', 7)]
+
+
+def test_async_batched_write_skips_none(monkeypatch):
+    writes = record_writes(monkeypatch, AsyncGuiApi, is_async=True)
+    asyncio.run(AsyncGuiApi.setAfeLanes('Line Side', [0, 1, 2], 'tx', DATA))
+    assert len(writes) == 3
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from api.cancel_token import CancelToken
+from widgets.utils.lane_executor import LaneExecutor
+
+
+class Tracker:
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, lane):
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return lane * 2
+
+
+def test_per_call_limit_and_results():
+    tracker = Tracker()
+    results = dict(LaneExecutor.run_lanes(('dev', 'limit'), tracker, range(20), max_workers=3))
+    assert results == {lane: lane * 2 for lane in range(20)}
+    assert tracker.peak <= 3
+
+
+def test_mixed_limits_share_one_pool():
+    key = ('dev', 'mixed')
+    list(LaneExecutor.run_lanes(key, Tracker(0), range(4), max_workers=2))
+    pool = LaneExecutor.get_pool(key)
+    list(LaneExecutor.run_lanes(key, Tracker(0), range(4), max_workers=5))
+    assert LaneExecutor.get_pool(key) is pool
+
+
+def test_keys_are_independent():
+    assert LaneExecutor.get_pool(('a', 'Host Side')) is not LaneExecutor.get_pool(('b', 'Host Side'))
+
+
+def test_cancel_stops_submitting():
+    tracker = Tracker(0.05)
+    token = CancelToken()
+    results = []
+    for lane, result in LaneExecutor.run_lanes(('dev', 'cancel'), tracker, range(50),
+                                               max_workers=2, token=token):
+        results.append(lane)
+        token.cancel()
+    time.sleep(0.1)
+    assert len(results) == 1
+    assert tracker.calls <= 4
+
+
+def test_coalesced_batches_cover_all_lanes():
+    batches = list(LaneExecutor.run_lanes_coalesced(('dev', 'batch'), Tracker(0.001),
+                                                    range(40), 0.05, max_workers=8))
+    lanes = sorted(lane for batch in batches for lane, _ in batch)
+    assert lanes == list(range(40))
+    assert len(batches) < 40
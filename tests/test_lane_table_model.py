@@ -0,0 +1,59 @@
+import pytest
+from PySide6.QtCore import Qt
+
+from widgets.utils.base_frame import LaneTableModel
+from widgets.utils.register_schema import ColumnLayout, FieldSpec
+
+FIELDS = [FieldSpec('mode', access='rw', range=[0, 10]),
+          FieldSpec('gain', type='float', access='rw'),
+          FieldSpec('temp')]
+
+
+@pytest.fixture
+def model(qapp):
+    model = LaneTableModel(ColumnLayout(FIELDS), highlight_changes=False)
+    model.update_lanes([(0, {'mode': 1, 'gain': 0.5, 'temp': 30}),
+                        (1, {'mode': 2, 'gain': 1.5, 'temp': 31})])
+    return model
+
+
+def test_set_data_validates_type_range_and_access(model):
+    mode, gain, temp = (model.index(0, col) for col in (1, 2, 3))
+    assert not model.setData(mode, 'abc')
+    assert not model.setData(mode, '11')
+    assert not model.setData(temp, '40')
+    assert model.setData(gain, '2.25')
+    assert model.edited_values(0) == {'gain': 2.25}
+
+
+def test_edits_are_cleared_after_set(model):
+    model.setData(model.index(0, 1), '5')
+    model.setData(model.index(1, 1), '7')
+    # 设备返回与修改后的值一致：写入成功，不再是待写入字段
+    model.update_lanes([(0, {'mode': 5})])
+    assert model.edited_values(0) == {}
+    assert model.edited_values(1) == {'mode': 7}
+    # 读到的值不会覆盖尚未写入的修改
+    model.update_lanes([(1, {'mode': 3})])
+    assert model.data(model.index(1, 1)) == '7'
+    model.discard_edits(1)
+    assert model.data(model.index(1, 1)) == '3'
+
+
+def test_out_of_order_batch_updates_by_lane(model):
+    changes = []
+    model.dataChanged.connect(lambda top, bottom: changes.append(
+        (top.row(), top.column(), bottom.row(), bottom.column())))
+    model.update_lanes([(3, {'mode': 9}), (1, {'temp': 40}), (2, {'mode': 8}),
+                        (0, {'mode': 4})])
+    assert [model.lane_at(row) for row in range(model.rowCount())] == [0, 1, 3, 2]
+    assert model.data(model.index(0, 1)) == '4'
+    assert model.data(model.index(1, 3)) == '40'
+    assert model.row_of(2) == 3 and model.data(model.index(3, 1)) == '8'
+    # 相邻的两行合并为一次 dataChanged，覆盖两行的变化列范围
+    assert changes == [(0, 1, 1, 3)]
+
+    model.remove_lane(1)
+    assert model.row_of(3) == 1 and model.row_of(2) == 2
+    model.update_lanes([(2, {'temp': 50})])
+    assert model.data(model.index(2, 3), Qt.DisplayRole) == '50'
@@ -0,0 +1,31 @@
+import pytest
+
+from api.cancel_token import CancelToken, OperationCancelled, use_token
+from log_export import default_log_dir, export_log
+
+
+def test_default_log_dir_is_not_relative(monkeypatch):
+    monkeypatch.delenv('GUI_LOG_DIR', raising=False)
+    assert default_log_dir().is_absolute()
+    monkeypatch.setenv('GUI_LOG_DIR', '/tmp/x/logs')
+    assert str(default_log_dir()) == '/tmp/x/logs'
+
+
+def test_cancelled_export_removes_partial_files(tmp_path):
+    token = CancelToken()
+
+    def chunks():
+        for i in range(4):
+            if i == 2:
+                token.cancel()
+            yield b'line %d\n' % i * 1000
+
+    with use_token(token), pytest.raises(OperationCancelled):
+        export_log(chunks(), tmp_path / 'dump', max_bytes=1, compression='gzip')
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_export_keeps_files(tmp_path):
+    writer = export_log(iter([b'a\n', b'b\n']), tmp_path / 'dump', max_bytes=1, compression='gzip')
+    assert len(writer.files) == 2
+    assert all(path.exists() for path in writer.files)
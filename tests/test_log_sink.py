@@ -0,0 +1,17 @@
+from PySide6.QtWidgets import QPlainTextEdit
+
+from widgets.utils.log_sink import LogSink
+
+
+def test_evicted_lines_spill_to_file_and_close_releases_it(qapp, tmp_path):
+    path = tmp_path / 'console.log'
+    sink = LogSink(QPlainTextEdit(), max_block_count=3, spill_path=path)
+    for i in range(5):
+        sink.write(f'line {i}')
+    sink.close()
+    assert path.read_text(encoding='utf-8').splitlines() == ['line 0', 'line 1']
+    assert sink.text_edit.toPlainText().splitlines() == ['line 2', 'line 3', 'line 4']
+    # 关闭后不再写文件，重复关闭无害
+    sink.write('line 5')
+    sink.close()
+    assert path.read_text(encoding='utf-8').splitlines() == ['line 0', 'line 1']
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from api.cancel_token import OperationCancelled
+from api.metrics import Metrics, instrumented, metrics
+
+
+def test_cancelled_block_is_not_recorded():
+    m = Metrics()
+    with pytest.raises(OperationCancelled):
+        with m.timed('op'):
+            raise OperationCancelled()
+    assert m.snapshot() == {}
+
+
+def test_block_inside_cancel_handler_is_recorded():
+    m = Metrics()
+    try:
+        raise OperationCancelled()
+    except OperationCancelled:
+        with m.timed('cleanup'):
+            pass
+    assert m.snapshot()['cleanup']['count'] == 1
+
+
+def test_failure_is_counted_as_error():
+    m = Metrics()
+    with pytest.raises(ValueError):
+        with m.timed('op'):
+            raise ValueError()
+    with m.timed('op') as timing:
+        timing.ok = False
+    assert m.snapshot()['op']['errors'] == 2
+
+
+def test_async_cancel_is_not_a_failure():
+    class Api:
+        @classmethod
+        @instrumented('Test')
+        async def slow(cls, side, lane):
+            await asyncio.sleep(10)
+            return True, {}
+
+        @classmethod
+        @instrumented('Test')
+        async def fast(cls, side, lane):
+            return False, {}
+
+    async def main():
+        task = asyncio.create_task(Api.slow('Host Side', 0))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await Api.fast('Host Side', 0)
+
+    metrics.reset()
+    asyncio.run(main())
+    snapshot = metrics.snapshot()
+    assert 'Test.slow' not in snapshot
+    assert snapshot['Test.fast']['errors'] == 1
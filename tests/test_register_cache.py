@@ -0,0 +1,73 @@
+from api import register_cache as register_cache_module
+from api.gui_api import rows_to_columns
+from api.register_cache import RegisterCache
+
+
+class FakeApi:
+    def __init__(self):
+        self.reads = []
+        self.value = 1
+
+    def getDriver(self, side, lane):
+        self.reads.append(lane)
+        return True, {'mode': self.value, 'temp': 30 + lane}
+
+    def getDriverLanes(self, side, lanes):
+        self.reads.extend(lanes)
+        return True, rows_to_columns(lanes, [{'mode': self.value, 'temp': 30 + lane}
+                                             for lane in lanes])
+
+    def setDriver(self, side, lane, data):
+        return True, data
+
+    def setDriverLanes(self, side, lanes, data):
+        return True, dict(data, lane=list(lanes))
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_expiry_uses_shortest_field_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(register_cache_module.time, 'monotonic', clock)
+    api = FakeApi()
+    cache = RegisterCache(api, ttl={'temp': 0.5}, default_ttl=5)
+    cache.getDriver('Host Side', 0)
+    clock.now += 0.4
+    cache.getDriver('Host Side', 0)
+    assert api.reads == [0]
+    clock.now += 0.2
+    cache.getDriver('Host Side', 0)
+    assert api.reads == [0, 0]
+
+
+def test_lru_eviction():
+    api = FakeApi()
+    cache = RegisterCache(api, max_entries=2)
+    cache.getDriver('Host Side', 0)
+    cache.getDriver('Host Side', 1)
+    cache.getDriver('Host Side', 0)  # lane0 最近使用，淘汰 lane1
+    cache.getDriver('Host Side', 2)
+    assert cache.peek('getDriver', 'Host Side', 1) is None
+    assert cache.peek('getDriver', 'Host Side', 0) is not None
+    cache.getDriverLanes('Host Side', [0, 1, 2])
+    assert api.reads == [0, 1, 2, 1]
+
+
+def test_write_through_merges_into_read_entries():
+    api = FakeApi()
+    cache = RegisterCache(api)
+    cache.getDriverLanes('Host Side', [0, 1])
+    cache.setDriver('Host Side', 0, {'mode': 7})
+    cache.setDriverLanes('Host Side', [0, 1], {'mode': [None, 9]})
+    assert cache.getDriver('Host Side', 0) == (True, {'mode': 7, 'temp': 30})
+    assert cache.getDriver('Host Side', 1) == (True, {'mode': 9, 'temp': 31})
+    assert api.reads == [0, 1]
+    # 没有读缓存项时写入不会凭空创建
+    cache.setDriver('Host Side', 5, {'mode': 1})
+    assert cache.peek('getDriver', 'Host Side', 5) is None
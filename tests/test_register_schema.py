@@ -0,0 +1,21 @@
+from widgets.utils import register_schema
+from widgets.utils.register_schema import ColumnLayout, SCHEMA_DIR, load_schema
+
+
+def test_legacy_columns_filter_by_side():
+    columns = ["", "mode.rw", "a.ls.rw", "b.hs", "c", "Operation"]
+    host = ColumnLayout.from_columns(columns, 'Host Side')
+    assert host.keys == [None, 'mode', 'b', 'c', None]
+    assert host.editable == [False, True, False, False, False]
+    line = ColumnLayout.from_columns(columns, 'Line Side')
+    assert line.keys == [None, 'mode', 'a', 'c', None]
+    assert line.editable == [False, True, True, False, False]
+    assert ColumnLayout.from_columns(columns).keys == [None, 'mode', 'a', 'b', 'c', None]
+
+
+def test_builtin_schemas_do_not_need_yaml(monkeypatch):
+    monkeypatch.setattr(register_schema, 'yaml', None)
+    monkeypatch.setattr(register_schema, '_schemas', {})
+    for path in SCHEMA_DIR.glob('*.json'):
+        schema = load_schema(path.name)
+        assert schema.layout('Host Side').fields
@@ -0,0 +1,97 @@
+import pytest
+from PySide6.QtCore import QObject, Signal
+
+from scheduler import Job, OperationScheduler
+
+
+class FakeWorker(QObject):
+    """不启动线程的 OperationWorker 替身，由测试调用 complete() 结束"""
+    finished = Signal()
+    log_message = Signal(str)
+    progress = Signal(object, object, float)
+    started = []
+
+    def __init__(self, operation_type, device=None, **kwargs):
+        super().__init__()
+        self.operation_type = operation_type
+        self.device = device
+        self.cancelled = False
+        self.error = None
+
+    def start(self):
+        FakeWorker.started.append(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def complete(self, error=None):
+        self.error = error
+        self.finished.emit()
+
+    def isFinished(self):
+        return True
+
+    def wait(self, timeout=None):
+        return True
+
+
+@pytest.fixture
+def scheduler(qapp):
+    FakeWorker.started = []
+    scheduler = OperationScheduler()
+    scheduler.worker_class = FakeWorker
+    return scheduler
+
+
+def running(scheduler):
+    return [job.operation_type for job in scheduler.jobs.values() if job.status == Job.RUNNING]
+
+
+def test_chain_runs_in_order_and_stops_on_failure(scheduler):
+    upgrade, reset, mode = scheduler.submit_chain('A', [('upgrade', {}), ('chip_reset', {}),
+                                                        ('work_mode', {})])
+    assert running(scheduler) == ['upgrade']
+    upgrade.worker.complete()
+    assert upgrade.status == Job.DONE and running(scheduler) == ['chip_reset']
+    reset.worker.complete(error=RuntimeError('boom'))
+    assert reset.status == Job.FAILED and mode.status == Job.CANCELLED
+
+
+def test_per_device_limit(scheduler):
+    a1 = scheduler.submit('power_reset', 'A')
+    scheduler.submit('chip_reset', 'A')
+    scheduler.submit('power_reset', 'B')
+    assert running(scheduler) == ['power_reset', 'power_reset']
+    scheduler.set_device_limit('A', 2)
+    assert len(running(scheduler)) == 3
+    a1.worker.complete()
+    assert a1.status == Job.DONE and len(running(scheduler)) == 2
+
+
+def test_cancel_running_and_pending(scheduler):
+    first = scheduler.submit('power_reset', 'A')
+    second = scheduler.submit('chip_reset', 'A')
+    scheduler.cancel(second.job_id)
+    assert second.status == Job.CANCELLED
+    worker = first.worker
+    scheduler.cancel(first.job_id)
+    assert worker.cancelled
+    worker.complete()
+    worker.complete()  # finished 重复发出
+    assert first.status == Job.CANCELLED and first.worker is None
+
+
+def test_history_is_capped_but_keeps_dependencies(scheduler):
+    scheduler.MAX_HISTORY = 2
+    removed = []
+    scheduler.job_removed.connect(lambda job: removed.append(job.job_id))
+    blocker = scheduler.submit('upgrade', 'A')
+    dependent = scheduler.submit('chip_reset', 'B', depends_on=[blocker])
+    for _ in range(3):
+        scheduler.submit('power_reset', 'C').worker.complete()
+    assert removed == [3]
+    blocker.worker.complete()
+    # blocker 结束后 dependent 开始运行，依赖关系没有因裁剪而丢失
+    assert dependent.status == Job.RUNNING
+    dependent.worker.complete()
+    assert len([job for job in scheduler.jobs.values() if job.finished]) == 2
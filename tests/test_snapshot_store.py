@@ -0,0 +1,47 @@
+import time
+
+from api.snapshot_store import SnapshotStore, default_path
+
+
+def read(store, device, lane, value):
+    store.capture(device, 'getDriver', ('Host Side', lane), (True, {'driver_mode': value}))
+
+
+def test_default_path_is_not_relative(monkeypatch):
+    monkeypatch.delenv('GUI_SNAPSHOT_DB', raising=False)
+    assert default_path().is_absolute()
+    monkeypatch.setenv('GUI_SNAPSHOT_DB', '/tmp/x/snap.db')
+    assert str(default_path()) == '/tmp/x/snap.db'
+
+
+def test_disabled_store_records_nothing(tmp_path):
+    store = SnapshotStore(tmp_path / 'db' / 's.sqlite3', enabled=False)
+    read(store, 'a', 0, 1)
+    store.close()
+    assert not (tmp_path / 'db').exists()
+
+
+def test_prune_bounds_readings(tmp_path):
+    store = SnapshotStore(tmp_path / 's.sqlite3', max_readings=5)
+    for i in range(12):
+        read(store, 'a', 0, i)
+    store.flush()
+    store.prune()
+    history = store.history('a', 'Host Side', 0, 'driver_mode')
+    assert [value for _, value in history] == list(range(7, 12))
+    # latest 不受保留策略影响
+    assert store.values(('device', 'a'))[('getDriver', 'Host Side', 0, '', 'driver_mode')] == 11
+    store.close()
+
+
+def test_prune_drops_old_readings(tmp_path):
+    store = SnapshotStore(tmp_path / 's.sqlite3', retention=60)
+    read(store, 'a', 0, 1)
+    store.flush()
+    with store._conn:
+        store._conn.execute("UPDATE readings SET time = ?", (time.time() - 120,))
+    read(store, 'a', 0, 2)
+    store.flush()
+    store.prune()
+    assert [value for _, value in store.history('a', 'Host Side', 0, 'driver_mode')] == [2]
+    store.close()
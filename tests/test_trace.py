@@ -0,0 +1,47 @@
+import gzip
+import pickle
+import struct
+
+import pytest
+
+from api.trace import MAGIC, TraceReplayer, TraceWriter, read_trace
+
+
+class FakeApi:
+    pass
+
+
+def write_records(path, records):
+    writer = TraceWriter(str(path))
+    for record in records:
+        writer.write(record)
+    writer.close()
+
+
+def test_round_trip_and_replay(tmp_path):
+    path = tmp_path / 'run.trace'
+    record = ('api', 'board', 'getDriver', ('Host Side', 1), (True, {'driver_mode': 1}),
+              0.0, 0.01, None)
+    write_records(path, [record])
+
+    assert list(read_trace(str(path))) == [record]
+    replayer = TraceReplayer(str(path), speed=0)
+    assert replayer.getDriver('Host Side', 1) == (True, {'driver_mode': 1})
+
+
+def test_unsupported_version_is_rejected(tmp_path):
+    path = tmp_path / 'future.trace'
+    with gzip.open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<H', 99))
+    with pytest.raises(ValueError, match='version 99'):
+        list(read_trace(str(path)))
+
+
+def test_records_cannot_reference_objects(tmp_path):
+    path = tmp_path / 'evil.trace'
+    write_records(path, [])
+    data = pickle.dumps(FakeApi(), 4)
+    with gzip.open(path, 'ab') as f:
+        f.write(struct.pack('<I', len(data)) + data)
+    with pytest.raises(pickle.UnpicklingError):
+        list(read_trace(str(path)))
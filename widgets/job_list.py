@@ -0,0 +1,95 @@
+from PySide6.QtWidgets import (QTableWidget, QTableWidgetItem, QHeaderView,
+                               QAbstractItemView, QPushButton)
+from PySide6.QtCore import Qt, QTimer
+import time
+
+
+class JobListWidget(QTableWidget):
+    """作业列表：显示调度器中每个作业的状态与耗时，未结束的作业可单独取消"""
+    COLUMNS = ["#", "Device", "Operation", "Status", "Queued at", "Wait", "Run", ""]
+    CANCEL_COLUMN = 7
+    REFRESH_MS = 500
+
+    def __init__(self, scheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        # job_id -> 第一列的 item，删除行后行号会变化，用 item.row() 取当前行
+        self._items = {}
+
+        self.setColumnCount(len(self.COLUMNS))
+        self.setHorizontalHeaderLabels(self.COLUMNS)
+        self.verticalHeader().setVisible(False)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.horizontalHeader().setSectionResizeMode(self.CANCEL_COLUMN, QHeaderView.ResizeToContents)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+
+        scheduler.job_added.connect(self.add_job)
+        scheduler.job_changed.connect(self.update_job)
+        scheduler.job_removed.connect(self.remove_job)
+
+        # 运行中的作业需要定时刷新耗时
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self._refresh_active)
+
+    def add_job(self, job):
+        row = self.rowCount()
+        self.insertRow(row)
+        self._set_text(row, 0, str(job.job_id))
+        self._items[job.job_id] = self.item(row, 0)
+        self._set_text(row, 1, job.device)
+        self._set_text(row, 2, job.operation_type)
+        self._set_text(row, 4, time.strftime('%H:%M:%S', time.localtime(job.created_at)))
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(lambda: self.scheduler.cancel(job.job_id))
+        self.setCellWidget(row, self.CANCEL_COLUMN, cancel_btn)
+        self.update_job(job)
+        self.scrollToBottom()
+
+    def update_job(self, job):
+        item = self._items.get(job.job_id)
+        if item is None:
+            return
+        row = item.row()
+        self._set_text(row, 3, self._status_text(job))
+        self._set_text(row, 5, f'{job.wait_time():.1f}s')
+        run_time = job.run_time()
+        self._set_text(row, 6, '' if run_time is None else f'{run_time:.1f}s')
+        if job.finished and self.cellWidget(row, self.CANCEL_COLUMN) is not None:
+            self.removeCellWidget(row, self.CANCEL_COLUMN)
+
+        if self.scheduler.active_jobs():
+            if not self._timer.isActive():
+                self._timer.start()
+        else:
+            self._timer.stop()
+
+    def remove_job(self, job):
+        """调度器移除历史作业时同步删除对应的行"""
+        item = self._items.pop(job.job_id, None)
+        if item is not None:
+            self.removeRow(item.row())
+
+    @staticmethod
+    def _status_text(job):
+        if job.status != job.RUNNING or job.progress is None:
+            return job.status
+        sent, total, rate = job.progress
+        speed = f'{rate / (1024 * 1024):.1f} MB/s'
+        if total is None:  # 总量未知（如日志导出），只显示已处理的字节数
+            return f'{job.status} {sent / (1024 * 1024):.1f} MB {speed}'
+        percent = sent * 100 / total if total else 100
+        return f'{job.status} {percent:.0f}% {speed}'
+
+    def _refresh_active(self):
+        for job in self.scheduler.active_jobs():
+            self.update_job(job)
+
+    def _set_text(self, row, col, text):
+        item = self.item(row, col)
+        if item is None:
+            item = QTableWidgetItem()
+            item.setTextAlignment(Qt.AlignCenter)
+            self.setItem(row, col, item)
+        item.setText(text)
@@ -0,0 +1,13 @@
+from .utils.base_frame import BaseFrame
+from .utils.register_schema import load_schema
+
+
+class RegisterPage(BaseFrame):
+    """完全由页面声明文件生成的寄存器页面，新增页面不需要写代码"""
+
+    def __init__(self, schema, side=None, device=None):
+        self.SCHEMA = schema
+        # 未指定 side 时使用声明中的第一个 side
+        sides = load_schema(schema).sides
+        self.side = side or (sides[0] if sides else 'Host Side')
+        super().__init__(device)
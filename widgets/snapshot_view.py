@@ -0,0 +1,133 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+                               QComboBox, QLabel, QLineEdit, QTableView, QHeaderView,
+                               QAbstractItemView)
+from PySide6.QtCore import Qt, Slot, QAbstractTableModel, QModelIndex
+import time
+
+from api.snapshot_store import snapshot_store
+
+
+class DiffTableModel(QAbstractTableModel):
+    """快照对比结果：每行一个不同的属性"""
+    HEADERS = ["Op", "Side", "Lane", "Dir", "Key", "Left", "Right"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self._rows[index.row()][index.column()]
+            return '' if value is None else str(value)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+
+class SnapshotDiffView(QWidget):
+    """快照与对比：保存设备当前读数为快照，比较两个快照或两块板子"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.device_select = QComboBox()
+        self.label_input = QLineEdit()
+        self.label_input.setPlaceholderText("label")
+        take_btn = QPushButton("Take snapshot")
+        take_btn.clicked.connect(self.take_snapshot)
+
+        snapshot_layout = QHBoxLayout()
+        snapshot_layout.addWidget(QLabel("Device"))
+        snapshot_layout.addWidget(self.device_select)
+        snapshot_layout.addWidget(self.label_input)
+        snapshot_layout.addWidget(take_btn)
+        snapshot_layout.addStretch()
+
+        self.left_select = QComboBox()
+        self.right_select = QComboBox()
+        diff_btn = QPushButton("Diff")
+        diff_btn.clicked.connect(self.run_diff)
+        self.status = QLabel()
+
+        diff_layout = QHBoxLayout()
+        diff_layout.addWidget(self.left_select, 1)
+        diff_layout.addWidget(QLabel("vs"))
+        diff_layout.addWidget(self.right_select, 1)
+        diff_layout.addWidget(diff_btn)
+        diff_layout.addWidget(self.status)
+
+        self.diff_model = DiffTableModel(self)
+        self.diff_table = QTableView()
+        self.diff_table.setModel(self.diff_model)
+        self.diff_table.verticalHeader().setVisible(False)
+        self.diff_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.diff_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(snapshot_layout)
+        layout.addLayout(diff_layout)
+        layout.addWidget(self.diff_table)
+
+    def load_data(self):
+        """刷新设备与快照列表"""
+        devices = snapshot_store.devices()
+        self._reset_combo(self.device_select, [(device, device) for device in devices])
+
+        # 设备最新值在前，其后是已保存的快照（新的在前）
+        sources = [(f"live: {device}", ('device', device)) for device in devices]
+        for snapshot_id, device, label, taken_at in snapshot_store.snapshots():
+            stamp = time.strftime('%m-%d %H:%M:%S', time.localtime(taken_at))
+            sources.append((f"#{snapshot_id} {device} {label or ''} {stamp}",
+                            ('snapshot', snapshot_id)))
+        self._reset_combo(self.left_select, sources)
+        self._reset_combo(self.right_select, sources)
+        if len(sources) > 1 and self.right_select.currentIndex() == self.left_select.currentIndex():
+            self.right_select.setCurrentIndex(1)
+
+    @Slot()
+    def take_snapshot(self):
+        device = self.device_select.currentText()
+        if not device:
+            return
+        snapshot_id = snapshot_store.take_snapshot(device, self.label_input.text() or None)
+        self.status.setText(f"snapshot #{snapshot_id} saved")
+        self.load_data()
+
+    @Slot()
+    def run_diff(self):
+        left = self.left_select.currentData()
+        right = self.right_select.currentData()
+        if left is None or right is None:
+            return
+        start = time.perf_counter()
+        rows = snapshot_store.diff(left, right)
+        elapsed = time.perf_counter() - start
+        self.diff_model.set_rows(rows)
+        self.status.setText(f"{len(rows)} differences ({elapsed * 1000:.1f} ms)")
+
+    @staticmethod
+    def _reset_combo(combo, items):
+        current = combo.currentData()
+        combo.clear()
+        for text, data in items:
+            combo.addItem(text, data)
+        index = combo.findData(current)
+        if index >= 0:
+            combo.setCurrentIndex(index)
@@ -0,0 +1,93 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+                               QTableWidget, QTableWidgetItem, QHeaderView,
+                               QAbstractItemView, QFileDialog)
+from PySide6.QtCore import Qt, QTimer, Slot
+from pathlib import Path
+
+from api.metrics import metrics
+
+
+class StatsPanel(QWidget):
+    """事务统计面板：按 method 显示次数、错误率、耗时分位数与吞吐量"""
+    COLUMNS = ["Method", "Count", "Errors", "Error %", "Mean ms",
+               "p50 ms", "p95 ms", "p99 ms", "Rate /s"]
+    REFRESH_MS = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+
+        json_btn = QPushButton("Export JSON")
+        json_btn.clicked.connect(lambda: self.export('json'))
+        prom_btn = QPushButton("Export Prometheus")
+        prom_btn.clicked.connect(lambda: self.export('prometheus'))
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(json_btn)
+        button_layout.addWidget(prom_btn)
+        button_layout.addWidget(reset_btn)
+        button_layout.addStretch()
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(button_layout)
+        layout.addWidget(self.table)
+
+        # 只在面板可见时刷新
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    def load_data(self):
+        self.refresh()
+
+    @Slot()
+    def refresh(self):
+        snapshot = metrics.snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (method, stats) in enumerate(snapshot.items()):
+            values = [method, str(stats['count']), str(stats['errors']),
+                      f"{stats['error_rate'] * 100:.1f}", _ms(stats['mean']),
+                      _ms(stats['p50']), _ms(stats['p95']), _ms(stats['p99']),
+                      f"{stats['throughput']:.2f}"]
+            for col, text in enumerate(values):
+                item = self.table.item(row, col)
+                if item is None:
+                    item = QTableWidgetItem()
+                    item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter if col == 0 else Qt.AlignCenter)
+                    self.table.setItem(row, col, item)
+                item.setText(text)
+
+    @Slot()
+    def reset(self):
+        metrics.reset()
+        self.refresh()
+
+    def export(self, fmt):
+        if fmt == 'json':
+            path, _ = QFileDialog.getSaveFileName(self, "Export JSON", "metrics.json", "JSON (*.json)")
+            text = metrics.to_json()
+        else:
+            path, _ = QFileDialog.getSaveFileName(self, "Export Prometheus", "metrics.prom", "Text (*.prom *.txt)")
+            text = metrics.to_prometheus()
+        if path:
+            Path(path).write_text(text)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+
+def _ms(seconds):
+    return '' if seconds is None else f'{seconds * 1000:.1f}'
@@ -1,10 +1,10 @@
-from PySide6.QtWidgets import (QTableWidgetItem, QHeaderView,
+from PySide6.QtWidgets import (QTableWidget, QTableWidgetItem, QHeaderView,
                                QSizePolicy)
 from PySide6.QtCore import Qt
-from widgets.utils.base_frame import BaseTable
+from widgets.utils.base_frame import ColumnWidthMixin
 
 
-class TableOne(BaseTable):
+class TableOne(ColumnWidthMixin, QTableWidget):
     # 类级别常量定义
     COLUMNS = ["编号", "数值"]
     DEFAULT_ROW_COUNT = 5
@@ -14,7 +14,7 @@ class TableOne(BaseTable):
     }
 
     def __init__(self):
-        super().__init__(self.COLUMNS)
+        super().__init__()
         self.table_index = 1
 
         self._init_table_properties()
@@ -0,0 +1,216 @@
+import asyncio
+import concurrent.futures
+import inspect
+
+from PySide6.QtCore import QObject, Signal
+
+from api.async_gui_api import AsyncGuiApi
+from api.cancel_token import CancelToken, use_token
+from api.gui_api import columns_to_rows, rows_to_columns
+from .async_loop import AsyncLoopThread
+
+
+class AsyncDeviceOp(QObject):
+    """DeviceOperThread 的 asyncio 版本
+
+    构造参数、信号以及 start/cancel/isRunning 与 DeviceOperThread 相同，可以
+    直接替换。每个 lane（或 lane 分组）是事件循环线程中的一个任务，而不是
+    线程池中的一个线程。
+
+    api 的方法可以是协程（如 AsyncGuiApi），也可以是普通函数；后者会在
+    事件循环的默认线程池中执行，并绑定本操作的 CancelToken。BaseFrame 传入
+    设备会话的读缓存（DeviceSession.cache），与 DeviceOperThread 一样经过
+    事务并发上限、读缓存、快照和 trace 记录。
+
+    未指定 api 时使用 AsyncGuiApi，它直接访问设备，不经过 DeviceSession，
+    只用于基准测试等场合。
+
+    cancel() 在事件循环中取消任务并触发 CancelToken；finished 在所有事务
+    （包括线程池中正在执行的同步调用）都退出之后才发出。
+    """
+    results_ready = Signal(list)
+    log_message = Signal(str)
+    finished = Signal()
+
+    BATCH_SIZE = 16
+    COALESCE_INTERVAL = 0.016
+    # 同时挂起的事务数上限
+    MAX_CONCURRENCY = 1024
+
+    # 尚未结束的操作，保持引用直到 finished
+    _active = set()
+
+    def __init__(self, command, side=1, lane_list=[], *args, max_workers=None,
+                 batch_size=None, lane_data=None, api=None, device=None):
+        super().__init__()
+        self.command = command
+        self.side = side
+        self.device = device
+        self.lane_list = lane_list
+        self.extra_args = args
+        self.max_concurrency = max_workers or self.MAX_CONCURRENCY
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.lane_data = lane_data
+        self.api = api or AsyncGuiApi
+        self.token = CancelToken()
+        self._future = None
+        self._task = None
+        self._cancelled = False
+        # 尚未发出的结果，只在事件循环线程中访问
+        self._pending = []
+        self._last_flush = float('-inf')
+        self._flush_handle = None
+
+    def start(self):
+        AsyncDeviceOp._active.add(self)
+        self._future = AsyncLoopThread.instance().submit(self._run())
+        self._future.add_done_callback(self._on_done)
+
+    def isRunning(self):
+        return self._future is not None and not self._future.done()
+
+    def cancel(self):
+        """取消所有尚未完成的事务，之后不再发出结果"""
+        self._cancelled = True
+        self.token.cancel()
+        if self._future is not None:
+            # 不直接取消 concurrent Future：它会立即完成并发出 finished，
+            # 而此时任务还没有退出
+            AsyncLoopThread.instance().call_soon(self._cancel_task)
+
+    def _cancel_task(self):
+        # 任务尚未开始时 _run 会检查 _cancelled 并直接返回
+        if self._task is not None:
+            self._task.cancel()
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def wait(self, timeout_ms=None):
+        if self._future is None:
+            return True
+        done, _ = concurrent.futures.wait(
+            [self._future], None if timeout_ms is None else timeout_ms / 1000)
+        return bool(done)
+
+    @classmethod
+    def cancel_all(cls, wait_ms=3000):
+        for op in list(cls._active):
+            op.cancel()
+
+    def _on_done(self, future):
+        if self._cancelled:
+            self.log_message.emit('cancelled')
+        AsyncDeviceOp._active.discard(self)
+        self.finished.emit()
+
+    async def _run(self):
+        self._task = asyncio.current_task()
+        if self._cancelled:
+            return
+        lanes = list(self.lane_list)
+        batch_method = getattr(self.api, f'{self.command}Lanes', None)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if batch_method and len(lanes) > 1:
+            items = [tuple(lanes[i:i + self.batch_size])
+                     for i in range(0, len(lanes), self.batch_size)]
+            op = self._lanes_op
+        else:
+            items = lanes
+            op = self._one_lane_op
+
+        async def run_item(item):
+            async with semaphore:
+                try:
+                    return item, await op(item)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    return item, e
+
+        # 哪个事务先完成就先收集哪个结果，与 DeviceOperThread 一样按时间窗口合并发出
+        tasks = [asyncio.create_task(run_item(item)) for item in items]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item, result = await next_done
+                if self._cancelled:
+                    return
+                self._collect(item, result)
+                self._schedule_flush()
+            self._flush()
+        finally:
+            # 被取消或提前返回时，尚未完成（包括还在等待并发名额）的事务一并取消，
+            # 并等它们退出后再结束
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+
+    def _collect(self, item, result):
+        if isinstance(item, tuple):
+            if isinstance(result, Exception):
+                self.log_message.emit(f'lanes{list(item)} failed: {result}')
+                self._pending.extend((False, lane, {}) for lane in item)
+            elif not result[0]:
+                self._pending.extend((False, lane, {}) for lane in item)
+            else:
+                self._pending.extend((True, lane, row_data)
+                                     for lane, row_data in columns_to_rows(result[1]))
+        elif isinstance(result, Exception):
+            self.log_message.emit(f'lane{item} failed: {result}')
+            self._pending.append((False, item, {}))
+        else:
+            self._pending.append((result[0], item, result[1]))
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        remaining = self._last_flush + self.COALESCE_INTERVAL - loop.time()
+        if remaining <= 0:
+            self._flush()
+        else:
+            self._flush_handle = loop.call_later(remaining, self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        if self._cancelled or not self._pending:
+            return
+        results, self._pending = self._pending, []
+        self._last_flush = asyncio.get_running_loop().time()
+        self.results_ready.emit(results)
+
+    async def _one_lane_op(self, lane):
+        self.log_message.emit(f'begin:{lane}')
+        args = self.extra_args
+        if self.lane_data is not None:
+            args += (self.lane_data[lane],)
+        return await self._call(getattr(self.api, self.command), self.side, lane, *args)
+
+    async def _lanes_op(self, chunk):
+        self.log_message.emit(f'begin:{chunk[0]}-{chunk[-1]}')
+        args = self.extra_args
+        if self.lane_data is not None:
+            args += (rows_to_columns(
+                chunk, [self.lane_data[lane] for lane in chunk]),)
+        method = getattr(self.api, f'{self.command}Lanes')
+        return await self._call(method, self.side, list(chunk), *args)
+
+    async def _call(self, method, *args):
+        if inspect.iscoroutinefunction(method):
+            return await method(*args)
+        future = asyncio.get_running_loop().run_in_executor(
+            None, self._call_with_token, method, args)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # 线程中的调用无法中断，CancelToken 已触发，等它在下一个检查点退出
+            await asyncio.gather(future, return_exceptions=True)
+            raise
+
+    def _call_with_token(self, method, args):
+        with use_token(self.token):
+            return method(*args)
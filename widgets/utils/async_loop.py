@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+
+class AsyncLoopThread:
+    """运行 asyncio 事件循环的专用线程
+
+    Qt 事件循环留在 GUI 线程，所有协程都提交到这一个线程中的事件循环执行，
+    结果通过 Qt 信号（跨线程自动排队）回到 GUI 线程。
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name='asyncio-loop', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def instance(cls):
+        """获取（必要时启动）共享的事件循环线程"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """在事件循环中执行协程，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    @classmethod
+    def shutdown(cls, timeout=3.0):
+        """取消所有任务并停止事件循环（程序退出时调用）"""
+        with cls._lock:
+            instance, cls._instance = cls._instance, None
+        if instance is None:
+            return
+
+        async def cancel_all():
+            tasks = [task for task in asyncio.all_tasks()
+                     if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            instance.submit(cancel_all()).result(timeout)
+        except Exception:
+            pass
+        instance.loop.call_soon_threadsafe(instance.loop.stop)
+        instance._thread.join(timeout)
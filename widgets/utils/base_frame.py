@@ -1,38 +1,58 @@
 from PySide6.QtWidgets import (
-    QTableWidget, QHeaderView, QSizePolicy, QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QLabel,
-    QLineEdit, QPlainTextEdit, QToolButton, QSplitter)
-from PySide6.QtGui import QFontMetrics, QIcon
-from PySide6.QtCore import Qt, QSize, Slot
-
+    QTableView, QAbstractItemView, QStyledItemDelegate, QHeaderView, QSizePolicy, QWidget,
+    QHBoxLayout, QVBoxLayout, QPushButton, QLabel, QLineEdit, QPlainTextEdit, QToolButton, QSplitter,
+    QCheckBox, QSpinBox, QApplication, QStyle, QStyleOptionButton)
+from PySide6.QtGui import QFontMetrics, QIcon, QBrush, QColor, QIntValidator, QDoubleValidator
+from PySide6.QtCore import (Qt, QSize, Slot, Signal, QTimer, QAbstractTableModel, QModelIndex,
+                            QPersistentModelIndex, QEvent, QRect)
+import time
+from collections import Counter
+
+from api.device_session import session_pool
+from api.metrics import metrics
+from .async_device_op import AsyncDeviceOp
+from .device_oper_thread import DeviceOperThread
+from .log_sink import LogSink
 from .progress_indicator import QProgressIndicator
+from .register_schema import ColumnLayout, load_schema
 
 
 class BaseFrame(QWidget):
-    @staticmethod
-    def _process_fields(fields, side):
-        results = []
-        for item in fields:
-            if '.hs' in item:
-                if side == 'Host Side':
-                    results.append(item.replace('.hs', ''))
-            elif '.ls' in item:
-                if side == 'Line Side':
-                    results.append(item.replace('.ls', ''))
-            else:
-                results.append(item)
-        return results
-
-    def __init__(self):
+    # 监控模式默认刷新间隔
+    MONITOR_INTERVAL_MS = 1000
+    # 子类指定设备接口：get{DEV_OP}/set{DEV_OP}，以及 lane 之后的固定参数
+    DEV_OP = None
+    DEV_OP_ARGS = ()
+    # 页面声明文件（见 register_schema），指定后 DEV_OP/DEV_OP_ARGS/LANE_COUNT
+    # 与列布局都取自该文件；未指定时使用子类的 COLUMNS
+    SCHEMA = None
+    # 为 True 时设备操作以协程方式在 asyncio 事件循环线程中执行（AsyncDeviceOp），
+    # 同样经过设备会话的读缓存、事务并发上限与快照记录
+    ASYNC_BACKEND = False
+
+    def __init__(self, device=None):
         super().__init__()
+        # 设备会话：同一设备的所有页面共享连接与读缓存
+        self.session = session_pool.get(device)
+        self.column_layout = self._load_column_layout()
         self.mainLayout = QVBoxLayout()
         self.fetcher_thread = None
+        self.monitor_thread = None
+        # 正在被设备操作线程访问的 lane -> 访问它的线程数，计数大于 0 的 lane
+        # 监控模式不会重复读取；已取消但尚未结束的旧线程同样计入
+        self._inflight_lanes = Counter()
 
         # 添加spinner
         self.spinner = QProgressIndicator(self)
         self.spinner.hide()
+        # spinner 旁边的取消按钮
+        self.cancelBtn = QPushButton('Cancel', self)
+        self.cancelBtn.clicked.connect(self.cancel_operation)
+        self.cancelBtn.hide()
 
         self.consoleWidget = ConsoleWidget()
-        self.tableWidget = BaseTable(self.COLUMNS)
+        self.tableWidget = BaseTable(self.column_layout)
+        self.tableWidget.log_message.connect(self.consoleWidget.log)
 
         self.splitter = QSplitter()
         self.splitter.setOrientation(Qt.Orientation.Vertical)
@@ -40,30 +60,263 @@ class BaseFrame(QWidget):
         self.splitter.addWidget(self.consoleWidget)
         self.splitter.setSizes([200, 100])
 
+        self.monitor_timer = QTimer(self)
+        self.monitor_timer.timeout.connect(self._poll_lanes)
+
+        self.mainLayout.addLayout(self._create_tool_bar())
         self.mainLayout.addWidget(self.splitter)
         self.setLayout(self.mainLayout)
 
+    def _load_column_layout(self):
+        if self.SCHEMA is None:
+            return ColumnLayout.from_columns(self.COLUMNS, self.side)
+        schema = load_schema(self.SCHEMA)
+        self.DEV_OP = schema.dev_op
+        self.DEV_OP_ARGS = schema.dev_op_args
+        self.LANE_COUNT = schema.lane_count
+        layout = schema.layout(self.side)
+        self.COLUMNS = layout.headers
+        return layout
+
+    def _create_tool_bar(self):
+        """创建工具栏：多行批量操作与监控模式"""
+        self.getSelectedBtn = QPushButton('Get selected')
+        self.getSelectedBtn.clicked.connect(self.get_selected)
+        self.setSelectedBtn = QPushButton('Set selected')
+        self.setSelectedBtn.clicked.connect(self.set_selected)
+        self.applySelectedBtn = QPushButton('Apply to selected')
+        self.applySelectedBtn.setToolTip(
+            'Copy the current cell value to the same column of all selected lanes')
+        self.applySelectedBtn.clicked.connect(self.apply_to_selected)
+
+        self.monitorCheck = QCheckBox('Monitor')
+        self.monitorCheck.toggled.connect(self.set_monitoring)
+
+        self.intervalSpin = QSpinBox()
+        self.intervalSpin.setRange(200, 60000)
+        self.intervalSpin.setSingleStep(100)
+        self.intervalSpin.setSuffix(' ms')
+        self.intervalSpin.setValue(self.MONITOR_INTERVAL_MS)
+        self.intervalSpin.valueChanged.connect(self.monitor_timer_interval_changed)
+
+        layout = QHBoxLayout()
+        layout.addWidget(self.getSelectedBtn)
+        layout.addWidget(self.setSelectedBtn)
+        layout.addWidget(self.applySelectedBtn)
+        layout.addSpacing(20)
+        layout.addWidget(self.monitorCheck)
+        layout.addWidget(QLabel('Interval'))
+        layout.addWidget(self.intervalSpin)
+        layout.addStretch()
+        return layout
+
     def load_data(self):
         """基类的数据加载方法"""
-        # 如果已有正在运行的线程，先停止它
+        # 如果已有正在运行的线程，先取消它（不等待其结束）
         if self.fetcher_thread and self.fetcher_thread.isRunning():
-            self.fetcher_thread.quit()
-            self.fetcher_thread.wait()
+            self.fetcher_thread.cancel()
+
+        self.tableWidget.clear_rows()
+
+        # 有缓存时先立即渲染缓存，再在后台重新读取
+        if self._render_cached():
+            self._poll_lanes()
+            return
 
-        self.tableWidget.setRowCount(0)
         self._show_loading_state()
 
         # 创建并启动新的数据获取线程
-        self.fetcher_thread = self._create_dev_op_thread()
+        self._start_dev_op_thread(self._create_dev_op_thread())
+
+    def _render_cached(self):
+        """用缓存中的值填充表格，返回渲染的 lane 数"""
+        results = []
+        for lane in self._lane_list():
+            values = self.session.cache.peek(
+                f'get{self.DEV_OP}', self.side, lane, *self.DEV_OP_ARGS)
+            if values is not None:
+                results.append((True, lane, values))
+        if results:
+            self.tableWidget.update_results(results)
+        return len(results)
+
+    def _create_dev_op_thread(self, op='get', lane=None, *args, lanes=None, api=None, **kwargs):
+        if lanes is not None:
+            lane_list = lanes
+        elif lane is not None:
+            lane_list = [lane]
+        else:
+            lane_list = self._lane_list()
+
+        if self.ASYNC_BACKEND:
+            return AsyncDeviceOp(
+                f"{op}{self.DEV_OP}",
+                self.side,
+                lane_list,
+                *self.DEV_OP_ARGS,
+                *args,
+                api=api or self.session.cache,
+                device=self.session.device,
+                **kwargs
+            )
+
+        return DeviceOperThread(
+            f"{op}{self.DEV_OP}",
+            self.side,
+            lane_list,
+            *self.DEV_OP_ARGS,
+            *args,
+            api=api or self.session.cache,
+            device=self.session.device,
+            **kwargs
+        )
+
+    def _start_dev_op_thread(self, thread):
+        """连接设备操作线程的信号并启动"""
+        self.fetcher_thread = thread
         if self.fetcher_thread:
-            self.fetcher_thread.row_ready.connect(
-                self.tableWidget.update_row)
-            self.fetcher_thread.log_message.connect(
-                self.consoleWidget.console.appendPlainText)
+            self._connect_dev_op_thread(self.fetcher_thread)
             self.fetcher_thread.finished.connect(
-                self._hide_loading_state)
+                lambda: self._on_fetcher_finished(thread))
             self.fetcher_thread.start()
 
+    def _on_fetcher_finished(self, thread):
+        # 已被取消并替换的旧线程结束时不影响当前的加载状态
+        if thread is self.fetcher_thread:
+            self.fetcher_thread = None
+            self._hide_loading_state()
+
+    @Slot()
+    def cancel_operation(self):
+        """取消当前的加载/批量操作，立即恢复界面"""
+        if self.fetcher_thread and self.fetcher_thread.isRunning():
+            self.fetcher_thread.cancel()
+            self.consoleWidget.log('cancelling...')
+        self.fetcher_thread = None
+        self._hide_loading_state()
+
+    def _connect_dev_op_thread(self, thread):
+        """将线程结果接到表格和控制台，并登记其访问的 lane"""
+        lanes = set(thread.lane_list)
+        self._inflight_lanes.update(lanes)
+        thread.results_ready.connect(self.tableWidget.update_results)
+        # 直接在工作线程中写入日志缓冲，不为每条日志唤醒 GUI 线程
+        thread.log_message.connect(self.consoleWidget.log, Qt.DirectConnection)
+        thread.finished.connect(lambda: self._release_lanes(lanes))
+
+    def _release_lanes(self, lanes):
+        """线程结束时只减去它自己登记的计数，不影响其他线程仍在访问的 lane"""
+        inflight = self._inflight_lanes
+        for lane in lanes:
+            inflight[lane] -= 1
+            if inflight[lane] <= 0:
+                del inflight[lane]
+        lanes.clear()  # finished 重复发出时不会多减
+
+    @Slot()
+    def get_selected(self):
+        """批量读取所有选中的 lane"""
+        rows = self.tableWidget.selected_rows()
+        if not rows:
+            return
+        model = self.tableWidget.lane_model
+        for row in rows:
+            model.discard_edits(row)
+        lanes = [model.lane_at(row) for row in rows]
+
+        self._show_loading_state()
+        thread = self._create_dev_op_thread('get', lanes=lanes)
+        self._log_lane_results(thread, 'get')
+        self._start_dev_op_thread(thread)
+
+    @Slot()
+    def set_selected(self):
+        """批量写入所有选中 lane 上用户修改过的字段"""
+        model = self.tableWidget.lane_model
+        lane_data = {}
+        for row in self.tableWidget.selected_rows():
+            row_data = model.edited_values(row)
+            if row_data:
+                lane_data[model.lane_at(row)] = row_data
+        if not lane_data:
+            self.consoleWidget.log('selected lanes: no changes to set')
+            return
+
+        self._show_loading_state()
+        thread = self._create_dev_op_thread(
+            'set', lanes=list(lane_data), lane_data=lane_data)
+        self._log_lane_results(thread, 'set')
+        self._start_dev_op_thread(thread)
+
+    @Slot()
+    def apply_to_selected(self):
+        """把当前单元格的值填到所有选中 lane 的同一列（随后用 Set selected 写入）"""
+        current = self.tableWidget.currentIndex()
+        model = self.tableWidget.lane_model
+        if not current.isValid() or not (model.flags(current) & Qt.ItemIsEditable):
+            return
+        value = model.data(current, Qt.EditRole)
+        for row in self.tableWidget.selected_rows():
+            model.setData(model.index(row, current.column()), value)
+
+    def _log_lane_results(self, thread, op):
+        """在控制台输出批量操作中每个 lane 的结果"""
+        console = self.consoleWidget
+
+        def log_results(results):
+            for ret, lane, _ in results:
+                console.log(f'{op} lane{lane}: {"ok" if ret else "failed"}')
+
+        thread.results_ready.connect(log_results)
+
+    @Slot(bool)
+    def set_monitoring(self, enabled):
+        """开启/关闭监控模式（按间隔周期性重新读取所有 lane）"""
+        if self.monitorCheck.isChecked() != enabled:
+            self.monitorCheck.setChecked(enabled)
+            return
+        if enabled and self.isVisible():
+            self.monitor_timer.start(self.intervalSpin.value())
+        else:
+            self.monitor_timer.stop()
+
+    @Slot(int)
+    def monitor_timer_interval_changed(self, interval):
+        if self.monitor_timer.isActive():
+            self.monitor_timer.start(interval)
+
+    def _poll_lanes(self):
+        """监控模式的一个周期"""
+        # 背压：上一个周期还没结束则跳过本周期
+        if self.monitor_thread and self.monitor_thread.isRunning():
+            return
+
+        # 每个 lane 同时最多只有一个读取请求
+        lanes = [lane for lane in self._lane_list()
+                 if lane not in self._inflight_lanes]
+        if not lanes:
+            return
+
+        # 监控总是访问设备，读到的值同时刷新缓存
+        api = self.session.cache.revalidating()
+        self.monitor_thread = self._create_dev_op_thread('get', lanes=lanes, api=api)
+        self._connect_dev_op_thread(self.monitor_thread)
+        self.monitor_thread.start()
+
+    def _lane_list(self):
+        return range(self.LANE_COUNT)
+
+    def showEvent(self, event):
+        """标签页重新显示时恢复监控"""
+        super().showEvent(event)
+        if self.monitorCheck.isChecked():
+            self.monitor_timer.start(self.intervalSpin.value())
+
+    def hideEvent(self, event):
+        """标签页被隐藏时暂停监控"""
+        self.monitor_timer.stop()
+        super().hideEvent(event)
+
     def _show_loading_state(self):
         """显示加载状态"""
         # 获取主窗口
@@ -82,12 +335,26 @@ class BaseFrame(QWidget):
         self.spinner.start()
         self.setEnabled(False)
 
+        # 取消按钮与 spinner 同属主窗口，不会随本页一起被禁用
+        self.cancelBtn.setParent(main_window)
+        self._place_cancel_button()
+        self.cancelBtn.show()
+        self.cancelBtn.raise_()
+
     def _hide_loading_state(self):
         """隐藏加载状态"""
         self.spinner.stop()
         self.spinner.hide()
+        self.cancelBtn.hide()
         self.setEnabled(True)
 
+    def _place_cancel_button(self):
+        self.cancelBtn.adjustSize()
+        self.cancelBtn.move(
+            self.spinner.x() + self.spinner.width() + 8,
+            self.spinner.y() + (self.spinner.height() - self.cancelBtn.height()) // 2
+        )
+
     def resizeEvent(self, event):
         """处理窗口大小改变事件"""
         super().resizeEvent(event)
@@ -96,60 +363,397 @@ class BaseFrame(QWidget):
                 self.width() // 2 - self.spinner.width() // 2,
                 self.height() // 2 - self.spinner.height() // 2
             )
+            self._place_cancel_button()
 
     def closeEvent(self, event):
-        """处理窗口关闭事件"""
-        if self.fetcher_thread and self.fetcher_thread.isRunning():
-            self.fetcher_thread.quit()
-            self.fetcher_thread.wait()
+        """处理窗口关闭事件：取消所有设备操作，不阻塞界面等待"""
+        self.monitor_timer.stop()
+        for thread in (self.monitor_thread, self.fetcher_thread):
+            if thread and thread.isRunning():
+                thread.cancel()
         super().closeEvent(event)
 
 
-class LineEditTableWidgetItem(QWidget):
-    def __init__(self, readOnly):
-        super(LineEditTableWidgetItem, self).__init__()
-        layout = QHBoxLayout(self)
-        layout.setAlignment(Qt.AlignCenter)
-        layout.setContentsMargins(0, 0, 0, 0)
-        self.lineEdit = QLineEdit()
-        self.lineEdit.setSizePolicy(
-            QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.lineEdit.setReadOnly(readOnly)
-        if readOnly:
-            self.lineEdit.setStyleSheet('background-color: grey;')
-        self.lineEdit.setAlignment(Qt.AlignCenter)
-        layout.addWidget(self.lineEdit)
-
-
-class BaseTable(QTableWidget):
-    def __init__(self, COLUMNS):
-        super().__init__()
-        self.COLUMNS = COLUMNS
-        self._init_table_properties()
-        self._init_table_appearance()
-
-    def _init_table_properties(self):
-        """初始化表格基本属性"""
-        self.setColumnCount(len(self.COLUMNS))
-        self.setHorizontalHeaderLabels(
-            [item.removesuffix('.rw') if item.endswith('.rw') else item for item in self.COLUMNS])
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+class LaneTableModel(QAbstractTableModel):
+    """以 lane 为行的表格数据模型
+
+    列布局由 ColumnLayout 给出（也可以传入旧的 COLUMNS 列表）：第 0 列为
+    lane，最后一列为操作列，中间为属性列。
+    单元格只保存普通值，不持有任何控件。更新时只对值发生变化的单元格
+    发出 dataChanged，并可选地短暂高亮这些单元格。
+
+    模型同时记录每个单元格最近一次从设备读到的值，用户编辑后与读到的值
+    不同的单元格视为待写入，Set 时只下发这些字段。
+    """
+    READ_ONLY_BRUSH = QBrush(QColor('grey'))
+    HIGHLIGHT_BRUSH = QBrush(QColor('#f5d76e'))
+    EDITED_BRUSH = QBrush(QColor('#cfe8ff'))
+    HIGHLIGHT_MS = 800  # 变化单元格的高亮时长
+
+    def __init__(self, columns, parent=None, highlight_changes=True):
+        super().__init__(parent)
+        if not isinstance(columns, ColumnLayout):
+            columns = ColumnLayout.from_columns(columns)
+        self.column_layout = columns
+        self._headers = columns.headers
+        # 每列对应的数据 key，lane 列与操作列为 None
+        self._keys = columns.keys
+        self._editable = columns.editable
+        self._fields = columns.fields
+        self._column_of = columns.column_of
+        self._lanes = []    # row -> lane
+        self._values = []   # row -> [value, ...]，与列一一对应
+        self._read_values = []  # row -> [value, ...]，最近一次从设备读到的值
+        self._row_by_lane = {}  # lane -> row，插入/删除时同步维护
+        self._edited = {}   # lane -> {col}，用户修改过且尚未写入的列
+
+        self.highlight_changes = highlight_changes
+        self._highlighted = {}  # (lane, col) -> 高亮截止时间
+        self._highlight_timer = QTimer(self)
+        self._highlight_timer.setSingleShot(True)
+        self._highlight_timer.timeout.connect(self._expire_highlights)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._lanes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self._headers[section]
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if self._editable[index.column()]:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if col == 0:
+                return f'lane{self._lanes[row]}'
+            value = self._values[row][col]
+            return None if value is None else str(value)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole:
+            if self._highlighted and (self._lanes[row], col) in self._highlighted:
+                return self.HIGHLIGHT_BRUSH
+            if col in self._edited.get(self._lanes[row], ()):
+                return self.EDITED_BRUSH
+            # 只读属性列保持原来的灰色背景
+            if self._keys[col] and not self._editable[col] \
+                    and self._values[row][col] is not None:
+                return self.READ_ONLY_BRUSH
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not self._editable[index.column()]:
+            return False
+        row, col = index.row(), index.column()
+        # 按声明的类型转换，类型或范围不符时拒绝这次编辑
+        try:
+            value = self._fields[col].convert(value)
+        except (TypeError, ValueError):
+            return False
+        self._values[row][col] = value
+
+        # 改回读到的值时不再视为待写入，多次修改同一字段只保留最后一次
+        edited = self._edited.setdefault(self._lanes[row], set())
+        if str(value) == str(self._read_values[row][col]):
+            edited.discard(col)
+        else:
+            edited.add(col)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def row_of(self, lane):
+        """返回 lane 所在的行，不存在时返回 -1"""
+        return self._row_by_lane.get(lane, -1)
+
+    def lane_at(self, row):
+        return self._lanes[row]
+
+    def insert_lane(self, lane, values):
+        """在末尾插入一个 lane，返回新行号"""
+        row = len(self._lanes)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._append_lane(lane, values)
+        self.endInsertRows()
+        return row
+
+    def _append_lane(self, lane, values):
+        self._row_by_lane[lane] = len(self._lanes)
+        self._lanes.append(lane)
+        self._values.append([values.get(key) if key else None
+                             for key in self._keys])
+        self._read_values.append(list(self._values[-1]))
+
+    def remove_lane(self, lane):
+        """删除一个 lane，其后各行的索引同步前移"""
+        row = self._row_by_lane.pop(lane, -1)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._lanes[row]
+        del self._values[row]
+        del self._read_values[row]
+        self._edited.pop(lane, None)
+        for moved_row in range(row, len(self._lanes)):
+            self._row_by_lane[self._lanes[moved_row]] = moved_row
+        self.endRemoveRows()
+
+    def update_lane(self, row, values):
+        """用 values 中非 None 的值更新一行，只通知值发生变化的单元格
+
+        用户修改过、尚未写入的单元格不会被覆盖；设备返回的值与修改后的值
+        一致时（写入成功）清除待写入标记。返回发生变化的列号列表。
+        """
+        changed = self._update_cells(row, values)
+
+        # 相邻的变化列合并为一次 dataChanged
+        start = 0
+        for i in range(1, len(changed) + 1):
+            if i == len(changed) or changed[i] != changed[i - 1] + 1:
+                self.dataChanged.emit(self.index(row, changed[start]),
+                                      self.index(row, changed[i - 1]))
+                start = i
+        return changed
+
+    def update_lanes(self, rows):
+        """批量更新/插入多个 lane，rows 为 [(lane, values), ...]
+
+        新 lane 一次插入到末尾；已有行中发生变化的单元格按相邻行合并，
+        每段连续的行只发出一次覆盖其变化列范围的 dataChanged，不重置模型。
+        """
+        new_lanes = {}
+        changed_rows = {}  # row -> (最小变化列, 最大变化列)
+        for lane, values in rows:
+            row = self._row_by_lane.get(lane, -1)
+            if row < 0:
+                if lane in new_lanes:
+                    # 同一批中重复的新 lane：后到的非 None 值覆盖先到的
+                    new_lanes[lane].update((key, value) for key, value in values.items()
+                                           if value is not None)
+                else:
+                    new_lanes[lane] = dict(values)
+                continue
+            changed = self._update_cells(row, values)
+            if changed:
+                low, high = changed_rows.get(row, (changed[0], changed[-1]))
+                changed_rows[row] = (min(low, changed[0]), max(high, changed[-1]))
+
+        if changed_rows:
+            ordered = sorted(changed_rows)
+            start = 0
+            for i in range(1, len(ordered) + 1):
+                if i == len(ordered) or ordered[i] != ordered[i - 1] + 1:
+                    spans = [changed_rows[row] for row in ordered[start:i]]
+                    self.dataChanged.emit(
+                        self.index(ordered[start], min(low for low, _ in spans)),
+                        self.index(ordered[i - 1], max(high for _, high in spans)))
+                    start = i
+
+        if new_lanes:
+            first = len(self._lanes)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_lanes) - 1)
+            for lane, values in new_lanes.items():
+                self._append_lane(lane, values)
+            self.endInsertRows()
+
+    def _update_cells(self, row, values):
+        """更新一行的单元格值，返回发生变化的列号（升序），不发出信号"""
+        cells = self._values[row]
+        read_cells = self._read_values[row]
+        edited = self._edited.get(self._lanes[row], set())
+        column_of = self._column_of
+        changed = []
+        for key, value in values.items():
+            col = column_of.get(key)
+            if col is None or value is None:
+                continue
+            read_cells[col] = value
+            # 按显示文本比较，设备返回的类型不一定与声明的类型一致
+            if col in edited:
+                if str(cells[col]) == str(value):
+                    edited.discard(col)
+                    changed.append(col)
+                continue
+            if cells[col] is None or str(cells[col]) != str(value):
+                cells[col] = value
+                changed.append(col)
+
+        changed.sort()
+        if changed and self.highlight_changes:
+            self._highlight(self._lanes[row], changed)
+        return changed
+
+    def _highlight(self, lane, cols):
+        expire_at = time.monotonic() + self.HIGHLIGHT_MS / 1000
+        for col in cols:
+            self._highlighted[(lane, col)] = expire_at
+        if not self._highlight_timer.isActive():
+            self._highlight_timer.start(self.HIGHLIGHT_MS)
+
+    def _expire_highlights(self):
+        """清除到期的高亮，并重绘对应单元格"""
+        now = time.monotonic()
+        expired = [cell for cell, expire_at in self._highlighted.items()
+                   if expire_at <= now]
+        for lane, col in expired:
+            del self._highlighted[(lane, col)]
+            row = self._row_by_lane.get(lane, -1)
+            if row >= 0:
+                index = self.index(row, col)
+                self.dataChanged.emit(index, index, [Qt.BackgroundRole])
+
+        if self._highlighted:
+            remaining = min(self._highlighted.values()) - now
+            self._highlight_timer.start(max(int(remaining * 1000), 1))
+
+    def editable_values(self, row):
+        """返回一行中所有可写列的值 {key: value}"""
+        return {key: value
+                for key, value, editable in zip(self._keys, self._values[row], self._editable)
+                if editable and value is not None}
+
+    def edited_values(self, row):
+        """返回一行中用户修改过、尚未写入的字段 {key: value}"""
+        cells = self._values[row]
+        return {self._keys[col]: cells[col]
+                for col in sorted(self._edited.get(self._lanes[row], ()))}
+
+    def discard_edits(self, row):
+        """放弃一行中尚未写入的修改，恢复为最近一次读到的值"""
+        edited = self._edited.pop(self._lanes[row], set())
+        for col in edited:
+            self._values[row][col] = self._read_values[row][col]
+            index = self.index(row, col)
+            self.dataChanged.emit(index, index)
+
+    def clear(self):
+        self.beginResetModel()
+        self._lanes.clear()
+        self._values.clear()
+        self._read_values.clear()
+        self._row_by_lane.clear()
+        self._edited.clear()
+        self._highlighted.clear()
+        self.endResetModel()
+
+
+class LineEditDelegate(QStyledItemDelegate):
+    """可写列的编辑代理：只在单元格编辑期间创建 QLineEdit"""
+
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        editor.setAlignment(Qt.AlignCenter)
+        # 按声明的类型与取值范围限制输入
+        field = index.model().column_layout.fields[index.column()]
+        if field is not None and field.type == 'int':
+            validator = QIntValidator(editor)
+            if field.range:
+                validator.setRange(*field.range)
+            editor.setValidator(validator)
+        elif field is not None and field.type == 'float':
+            validator = QDoubleValidator(editor)
+            if field.range:
+                validator.setRange(*field.range)
+            editor.setValidator(validator)
+        return editor
+
+
+class OperationButtonDelegate(QStyledItemDelegate):
+    """操作列的 Get/Set 按钮：由代理绘制，不为每行创建控件
+
+    只有可见的单元格才会被绘制，行数再多也不增加控件数量；点击在
+    editorEvent 中按按钮区域判断，发出 clicked(row, button)。
+    """
+    BUTTONS = ('Get', 'Set')
+    MARGINS = (5, 2, 5, 2)  # 左、上、右、下
+    SPACING = 6
+
+    clicked = Signal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pressed = None  # (QPersistentModelIndex, 按钮名)，鼠标按下尚未松开
+
+    def button_rects(self, rect):
+        left, top, right, bottom = self.MARGINS
+        area = rect.adjusted(left, top, -right, -bottom)
+        count = len(self.BUTTONS)
+        width = (area.width() - self.SPACING * (count - 1)) // count
+        return [QRect(area.left() + i * (width + self.SPACING), area.top(), width, area.height())
+                for i in range(count)]
+
+    def button_at(self, rect, pos):
+        for name, button_rect in zip(self.BUTTONS, self.button_rects(rect)):
+            if button_rect.contains(pos):
+                return name
+        return None
+
+    def paint(self, painter, option, index):
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, widget)
+        pressed = self._pressed
+        for name, rect in zip(self.BUTTONS, self.button_rects(option.rect)):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = name
+            button.palette = option.palette
+            button.fontMetrics = option.fontMetrics
+            button.state = QStyle.State_Enabled
+            if pressed is not None and pressed[1] == name and pressed[0] == index:
+                button.state |= QStyle.State_Sunken
+            else:
+                button.state |= QStyle.State_Raised
+            style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+
+    def editorEvent(self, event, model, option, index):
+        event_type = event.type()
+        if event_type not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease,
+                              QEvent.MouseButtonDblClick):
+            return super().editorEvent(event, model, option, index)
+        if event.button() != Qt.LeftButton:
+            return False
+
+        name = self.button_at(option.rect, event.position().toPoint())
+        if event_type == QEvent.MouseButtonRelease:
+            pressed, self._pressed = self._pressed, None
+            if pressed is not None:
+                self._repaint(option, pressed[0])
+                if name == pressed[1] and pressed[0] == index:
+                    self.clicked.emit(index.row(), name)
+            return pressed is not None
+        if name is None:
+            return False
+        # 按下（双击的第二次按下同样处理）：只记录状态，松开时才触发
+        self._pressed = (QPersistentModelIndex(index), name)
+        self._repaint(option, index)
+        return True
+
+    def cancel_press(self, view):
+        """鼠标在其他单元格松开时由视图调用，恢复按下的按钮"""
+        pressed, self._pressed = self._pressed, None
+        if pressed is not None and pressed[0].isValid():
+            view.update(QModelIndex(pressed[0]))
 
-    def _init_table_appearance(self):
-        """初始化表格外观"""
-        self.verticalHeader().setVisible(False)
+    @staticmethod
+    def _repaint(option, index):
+        if option.widget is not None and index.isValid():
+            option.widget.update(QModelIndex(index))
 
-        # 设置表头
-        header = self.horizontalHeader()
-        header.setStretchLastSection(True)
-        header.setSectionResizeMode(QHeaderView.Interactive)
 
-        # 调整列宽
-        COLUMN_WIDTHS = {
-            0: 50,   # lane列
-            len(self.COLUMNS) - 1: 150   # 操作列
-        }
-        self.adjust_columns(COLUMN_WIDTHS)
+class ColumnWidthMixin:
+    """按表头文字计算列宽，供 QTableView/QTableWidget 共用"""
 
     def adjust_columns(self, custom_widths=None):
         """
@@ -161,130 +765,158 @@ class BaseTable(QTableWidget):
         font_metrics = QFontMetrics(self.font())
         padding = 20  # 文字两侧的padding
 
-        for column in range(self.columnCount()):
+        for column in range(self.model().columnCount()):
             if custom_widths and column in custom_widths:
                 # 使用指定的固定宽度
                 width = custom_widths[column]
             else:
                 # 根据表头文字计算宽度
-                header_item = self.horizontalHeaderItem(column)
-                if header_item:
-                    header_text = header_item.text()
-                    width = font_metrics.horizontalAdvance(
-                        header_text) + padding
+                header_text = self.model().headerData(column, Qt.Horizontal)
+                width = font_metrics.horizontalAdvance(
+                    header_text or '') + padding
 
             header.setSectionResizeMode(column, QHeaderView.Fixed)
             self.setColumnWidth(column, width)
 
+
+class BaseTable(ColumnWidthMixin, QTableView):
+    # 设备操作失败等需要用户看到的消息，由所在页面接到控制台
+    log_message = Signal(str)
+    # 固定行高：视图不需要逐行计算高度，只绘制可见的行
+    ROW_HEIGHT = 30
+
+    def __init__(self, columns):
+        super().__init__()
+        if not isinstance(columns, ColumnLayout):
+            columns = ColumnLayout.from_columns(columns)
+        self.column_layout = columns
+        self.COLUMNS = columns.headers
+        self._init_table_properties()
+        self._init_table_appearance()
+
+    def _init_table_properties(self):
+        """初始化表格基本属性"""
+        self.lane_model = LaneTableModel(self.column_layout, self)
+        self.setModel(self.lane_model)
+        self.setItemDelegate(LineEditDelegate(self))
+        # 操作列按钮由代理绘制；按钮对应的行在点击时才确定，行被删除或移动后仍然正确
+        self.operation_delegate = OperationButtonDelegate(self)
+        self.operation_delegate.clicked.connect(self._on_operation_clicked)
+        self.setItemDelegateForColumn(self.column_layout.operation_column,
+                                      self.operation_delegate)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.DoubleClicked |
+                             QAbstractItemView.SelectedClicked |
+                             QAbstractItemView.EditKeyPressed |
+                             QAbstractItemView.AnyKeyPressed)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def _init_table_appearance(self):
+        """初始化表格外观"""
+        vertical_header = self.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(self.ROW_HEIGHT)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+
+        # 设置表头
+        header = self.horizontalHeader()
+        header.setStretchLastSection(True)
+        header.setSectionResizeMode(QHeaderView.Interactive)
+
+        # 调整列宽：lane 列、操作列以及声明了宽度的列使用固定宽度
+        self.adjust_columns(self.column_layout.widths)
+
+    def clear_rows(self):
+        """清空所有行"""
+        self.lane_model.clear()
+
+    def selected_rows(self):
+        """返回有单元格被选中的行（升序）"""
+        return sorted({index.row() for index in self.selectionModel().selectedIndexes()})
+
     def update_row(self, ret: bool, lane: int, row_data: dict):
         """更新或插入一行数据"""
         if ret is False:
-            print(f'dev op failed. lane:{lane}')
+            self.log_message.emit(f'dev op failed. lane:{lane}')
             return
 
-        existing_row = -1
-        for row in range(self.rowCount()):
-            if self.cellWidget(row, 0) and self.cellWidget(row, 0).text() == f'lane{lane}':
-                existing_row = row
-                break
-
-        if existing_row >= 0:
-            self._update_row_data(existing_row, row_data)
-        else:
-            new_row = self.rowCount()
-            self.insertRow(new_row)
-            self._update_row_data(new_row, row_data)
-            self._add_operation_buttons(new_row, len(self.COLUMNS) - 1)
-
-    def _update_row_data(self, row: int, values: dict):
-        """更新行数据"""
-        lane = QLabel(f'lane{row}')
-        lane.setAlignment(Qt.AlignCenter)
-        self.setCellWidget(row, 0, lane)
-
-        for col, header in enumerate(self.COLUMNS[1:-1], 1):
-            value_key = header
-            is_editable = header.endswith('.rw')
-            if is_editable:
-                value_key = header.removesuffix('.rw')
-
-            value = values.get(value_key)
-            if value is not None:
-                item = LineEditTableWidgetItem(not is_editable)
-                item.lineEdit.setText(str(value))
-                self.setCellWidget(row, col, item)
-
-    def _add_operation_buttons(self, row: int, col: int):
-        """添加操作按钮"""
-        operation_widget = QWidget()
-        layout = QHBoxLayout(operation_widget)
-        layout.setContentsMargins(5, 2, 5, 2)
-
-        get_btn = QPushButton("Get")
-        set_btn = QPushButton("Set")
-
-        get_btn.clicked.connect(lambda: self.on_get_clicked(row))
-        set_btn.clicked.connect(lambda: self.on_set_clicked(row))
-
-        layout.addWidget(get_btn)
-        layout.addWidget(set_btn)
-        self.setCellWidget(row, col, operation_widget)
+        # GUI 线程中更新表格的耗时
+        with metrics.timed('BaseTable.update_row', lane=lane):
+            existing_row = self.lane_model.row_of(lane)
+            if existing_row >= 0:
+                self.lane_model.update_lane(existing_row, row_data)
+            else:
+                self.lane_model.insert_lane(lane, row_data)
+
+    def remove_lane(self, lane: int):
+        """删除 lane 对应的行"""
+        self.lane_model.remove_lane(lane)
+
+    def update_results(self, results: list):
+        """应用设备操作线程合并后的一批结果 [(ret, lane, row_data), ...]"""
+        rows = []
+        failed = []
+        for ret, lane, row_data in results:
+            if ret is False:
+                failed.append(lane)
+                continue
+            rows.append((lane, row_data))
+        if failed:
+            # 整批失败的 lane 合并为一条消息
+            self.log_message.emit(f'dev op failed. lanes:{failed}')
+
+        # 整批只更新一次模型，耗时与批内结果数而不是信号数相关
+        with metrics.timed('BaseTable.update_results'):
+            self.lane_model.update_lanes(rows)
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        # 在操作列按下、在其他单元格松开时，代理收不到松开事件
+        self.operation_delegate.cancel_press(self)
+
+    def _on_operation_clicked(self, row, button):
+        if button == 'Get':
+            self.on_get_clicked(row)
+        elif button == 'Set':
+            self.on_set_clicked(row)
 
     def _create_dev_op_thread(self):
         raise NotImplementedError(
             "Subclasses must implement _create_dev_op_thread()")
 
     def on_get_clicked(self, row):
-        id_item: QLabel = self.cellWidget(row, 0)
-        if id_item:
-            row_id = id_item.text()
-            lane = int(row_id.replace('lane', ''))
-
-            # 修改获取父窗口的方法
-            parent = self.parent()
-            while parent and not isinstance(parent, BaseFrame):
-                parent = parent.parent()
-
-            if parent and isinstance(parent, BaseFrame):
-                parent._show_loading_state()
-                parent.fetcher_thread = parent._create_dev_op_thread(
-                    'get', lane)
-                parent.fetcher_thread.row_ready.connect(self.update_row)
-                parent.fetcher_thread.log_message.connect(
-                    parent.consoleWidget.console.appendPlainText)
-                parent.fetcher_thread.finished.connect(
-                    parent._hide_loading_state)
-                parent.fetcher_thread.start()
+        lane = self.lane_model.lane_at(row)
+        # 主动 Get 以设备上的值为准，放弃尚未写入的修改
+        self.lane_model.discard_edits(row)
+
+        # 修改获取父窗口的方法
+        parent = self.parent()
+        while parent and not isinstance(parent, BaseFrame):
+            parent = parent.parent()
+
+        if parent and isinstance(parent, BaseFrame):
+            parent._show_loading_state()
+            parent._start_dev_op_thread(parent._create_dev_op_thread(
+                'get', lane))
 
     def on_set_clicked(self, row):
-        # 获取当前行的所有数据
-        row_data = {}
-        id_item: QLabel = self.cellWidget(row, 0)
-        if id_item:
-            # 从第二列开始获取数据（跳过lane列）
-            for col, header in enumerate(self.COLUMNS[1:-1], 1):
-                item: LineEditTableWidgetItem = self.cellWidget(row, col)
-                if item and header.endswith('.rw'):
-                    row_data[header.removesuffix('.rw')] = item.lineEdit.text()
-
-            row_id = id_item.text()
-            lane = int(row_id.replace('lane', ''))
-
-            # 修改获取父窗口的方法
-            parent = self.parent()
-            while parent and not isinstance(parent, BaseFrame):
-                parent = parent.parent()
-
-            if parent and isinstance(parent, BaseFrame):
-                parent._show_loading_state()
-                parent.fetcher_thread = parent._create_dev_op_thread(
-                    'set', lane, row_data)
-                parent.fetcher_thread.row_ready.connect(self.update_row)
-                parent.fetcher_thread.log_message.connect(
-                    parent.consoleWidget.console.appendPlainText)
-                parent.fetcher_thread.finished.connect(
-                    parent._hide_loading_state)
-                parent.fetcher_thread.start()
+        # 只下发用户修改过的字段
+        row_data = self.lane_model.edited_values(row)
+        lane = self.lane_model.lane_at(row)
+
+        # 修改获取父窗口的方法
+        parent = self.parent()
+        while parent and not isinstance(parent, BaseFrame):
+            parent = parent.parent()
+
+        if parent and isinstance(parent, BaseFrame):
+            if not row_data:
+                parent.consoleWidget.log(f'lane{lane}: no changes to set')
+                return
+            parent._show_loading_state()
+            parent._start_dev_op_thread(parent._create_dev_op_thread(
+                'set', lane, row_data))
 
 
 class ConsoleWidget(QWidget):
@@ -295,6 +927,7 @@ class ConsoleWidget(QWidget):
 
         self.console = QPlainTextEdit()
         self.console.setReadOnly(True)
+        self.log_sink = LogSink(self.console)
         self.clearBtn = QToolButton()
         self.clearBtn.setToolTip('Clear console 1og')
         clearIcon = QIcon()
@@ -316,6 +949,11 @@ class ConsoleWidget(QWidget):
     def bind(self):
         self.clearBtn.clicked.connect(self.clearConsoleLog)
 
+    @Slot(str)
+    def log(self, message):
+        """输出一条日志，可在任意线程调用"""
+        self.log_sink.write(message)
+
     @Slot()
     def clearConsoleLog(self):
-        self.console.clear()
+        self.log_sink.clear()
@@ -1,27 +1,134 @@
 from PySide6.QtCore import QThread, Signal
-from api.gui_api import GuiApi
+from api.cancel_token import CancelToken
+from api.gui_api import GuiApi, columns_to_rows, rows_to_columns
+from api.metrics import metrics
+from .lane_executor import LaneExecutor
 
 
 class DeviceOperThread(QThread):
-    row_ready = Signal(bool, int, dict)
+    # 一批 lane 结果 [(ret, lane, {key: value}), ...]
+    # 同一时间窗口内完成的结果合并为一次发出，GUI 线程每帧最多处理一批
+    results_ready = Signal(list)
     # 添加信号用于日志输出
     log_message = Signal(str)
 
-    def __init__(self, command, side=1, lane_list=[], *args):
+    # 批量接口每次事务包含的最大 lane 数
+    BATCH_SIZE = 16
+    # 两次发出 results_ready 的最小间隔（秒），约一帧
+    COALESCE_INTERVAL = 0.016
+
+    # 尚未结束的线程，保持引用直到 finished，避免取消后不再被持有的线程提前析构
+    _active = set()
+
+    def __init__(self, command, side=1, lane_list=[], *args, max_workers=None,
+                 batch_size=None, lane_data=None, api=None, device=None):
         super().__init__()
 
         self.command = command
         self.side = side
+        # 所属设备，与 side 一起决定使用哪个 LaneExecutor 线程池
+        self.device = device
         self.lane_list = lane_list
         self.extra_args = args
+        # 本次操作的最大并发事务数，None 表示使用 LaneExecutor 默认值
+        self.max_workers = max_workers
+        self.batch_size = batch_size or self.BATCH_SIZE
+        # 按 lane 区分的写入数据 {lane: {key: value}}，作为最后一个参数传给接口
+        self.lane_data = lane_data
+        # 设备接口，可以是 GuiApi 本身或提供相同接口的对象（如 RegisterCache）
+        self.api = api or GuiApi
+        self.token = CancelToken()
+
+    def cancel(self):
+        """请求取消：正在进行的事务完成后不再发起新的事务，也不再发出结果"""
+        self.token.cancel()
+
+    def is_cancelled(self):
+        return self.token.cancelled
+
+    def start(self, *args):
+        DeviceOperThread._active.add(self)
+        self.finished.connect(self._release)
+        super().start(*args)
+
+    def _release(self):
+        DeviceOperThread._active.discard(self)
+
+    @classmethod
+    def cancel_all(cls, wait_ms=3000):
+        """取消所有线程并等待其退出（仅在程序退出时使用）"""
+        for thread in list(cls._active):
+            thread.cancel()
+        for thread in list(cls._active):
+            thread.wait(wait_ms)
 
     def run(self):
-        for lane in self.lane_list:
-            ret, row_data = self._one_lane_op(lane)
-            self.row_ready.emit(ret, lane, row_data)
+        lanes = list(self.lane_list)
+        batch_method = getattr(self.api, f'{self.command}Lanes', None)
+        # 整个操作（排队、设备事务、发出结果）的耗时
+        with metrics.timed(f'DeviceOperThread.{self.command}', self.side, lanes):
+            if batch_method and len(lanes) > 1:
+                self._run_batched(batch_method, lanes)
+            else:
+                self._run_per_lane(lanes)
+        if self.token.cancelled:
+            self.log_message.emit('cancelled')
+
+    def _run_per_lane(self, lanes):
+        # 各 lane 并发执行，先完成的 lane 先发出，同一窗口内完成的合并为一批
+        for batch in LaneExecutor.run_lanes_coalesced(
+                (self.device, self.side), self._one_lane_op, lanes, self.COALESCE_INTERVAL,
+                self.max_workers, self.token):
+            if self.token.cancelled:
+                break
+            results = []
+            for lane, result in batch:
+                if isinstance(result, Exception):
+                    self.log_message.emit(f'lane{lane} failed: {result}')
+                    results.append((False, lane, {}))
+                    continue
+                ret, row_data = result
+                results.append((ret, lane, row_data))
+            self.results_ready.emit(results)
+
+    def _run_batched(self, api_method, lanes):
+        # 按 batch_size 分组，每组一次事务，各组之间并发执行
+        chunks = [tuple(lanes[i:i + self.batch_size])
+                  for i in range(0, len(lanes), self.batch_size)]
+        for batch in LaneExecutor.run_lanes_coalesced(
+                (self.device, self.side), lambda chunk: self._lanes_op(api_method, chunk),
+                chunks, self.COALESCE_INTERVAL, self.max_workers, self.token):
+            if self.token.cancelled:
+                break
+            results = []
+            for chunk, result in batch:
+                if isinstance(result, Exception):
+                    self.log_message.emit(f'lanes{list(chunk)} failed: {result}')
+                    results.extend((False, lane, {}) for lane in chunk)
+                    continue
+                ret, columns = result
+                if not ret:
+                    results.extend((False, lane, {}) for lane in chunk)
+                    continue
+                # 列式结果在工作线程中拆分为按 lane 的结果
+                results.extend((True, lane, row_data)
+                               for lane, row_data in columns_to_rows(columns))
+            self.results_ready.emit(results)
 
     def _one_lane_op(self, lane):
         self.log_message.emit(f'begin:{lane}')
-        api_method = getattr(GuiApi, self.command)
-        ret, values = api_method(self.side, lane, *self.extra_args)
+        api_method = getattr(self.api, self.command)
+        args = self.extra_args
+        if self.lane_data is not None:
+            args += (self.lane_data[lane],)
+        ret, values = api_method(self.side, lane, *args)
         return ret, values
+
+    def _lanes_op(self, api_method, chunk):
+        self.log_message.emit(f'begin:{chunk[0]}-{chunk[-1]}')
+        args = self.extra_args
+        if self.lane_data is not None:
+            args += (rows_to_columns(
+                chunk, [self.lane_data[lane] for lane in chunk]),)
+        ret, columns = api_method(self.side, list(chunk), *args)
+        return ret, columns
@@ -0,0 +1,149 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import threading
+import time
+
+from api.cancel_token import use_token
+
+
+class LaneExecutor:
+    """按 (设备, side) 划分的有界 lane 并发执行池
+
+    每个 key 只创建一个线程池（POOL_SIZE 个线程，按需启动），同一 key 下
+    所有请求共享它，并发总数不超过 POOL_SIZE；不同 key 之间互不影响。
+    每次 run_lanes 的 max_workers 只限制该次调用：同时提交到池中的任务
+    不超过这个数，完成一个再提交下一个，不会重建线程池。
+    """
+    DEFAULT_MAX_WORKERS = 8
+    POOL_SIZE = 32
+
+    _pools = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_pool(cls, key):
+        """获取（必要时创建）key 对应的线程池"""
+        with cls._lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls._pools[key] = ThreadPoolExecutor(
+                    max_workers=cls.POOL_SIZE, thread_name_prefix=f'lane-{key}')
+            return pool
+
+    @classmethod
+    def run_lanes(cls, key, func, lanes, max_workers=None, token=None):
+        """并发执行 func(lane)，按完成顺序逐个产出 (lane, result)
+
+        lanes 中的元素也可以是 lane 分组（批量接口）。
+
+        func 抛出的异常以 (lane, exception) 的形式产出，由调用方决定如何处理。
+        token（CancelToken）被取消后，尚未开始的 lane 不再执行，也不再产出结果。
+        """
+        lanes = list(lanes)
+        if len(lanes) <= 1:
+            for lane in lanes:
+                yield lane, cls._call(func, lane, token)
+            return
+
+        window = _LaneWindow(cls.get_pool(key), func, lanes,
+                             max_workers or cls.DEFAULT_MAX_WORKERS, token)
+        while window.pending:
+            done = window.wait()
+            if done is None:
+                return
+            for item in done:
+                # 每产出一个结果后都检查取消，取消后不再产出
+                if token is not None and token.cancelled:
+                    window.cancel()
+                    return
+                yield item
+
+    @classmethod
+    def run_lanes_coalesced(cls, key, func, lanes, interval, max_workers=None, token=None):
+        """与 run_lanes 相同，但把结果合并成批产出 [(lane, result), ...]
+
+        两批之间至少间隔 interval 秒：距上一批已超过 interval 时，新完成的
+        结果立即产出；否则先累积，到期后与期间完成的其他结果一起产出。
+        """
+        lanes = list(lanes)
+        if len(lanes) <= 1:
+            for lane in lanes:
+                yield [(lane, cls._call(func, lane, token))]
+            return
+
+        window = _LaneWindow(cls.get_pool(key), func, lanes,
+                             max_workers or cls.DEFAULT_MAX_WORKERS, token)
+        batch = []
+        last_yield = float('-inf')
+        while window.pending:
+            # 没有累积的结果时一直等到有结果完成，否则最多等到本批到期
+            timeout = max(0.0, last_yield + interval - time.monotonic()) if batch else None
+            done = window.wait(timeout)
+            if done is None:
+                return
+            batch.extend(done)
+            if batch and time.monotonic() - last_yield >= interval:
+                yield batch
+                batch = []
+                last_yield = time.monotonic()
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _call(func, lane, token=None):
+        try:
+            with use_token(token):
+                if token is not None:
+                    token.raise_if_cancelled()
+                return func(lane)
+        except Exception as e:
+            return e
+
+    @classmethod
+    def shutdown_all(cls, wait=False):
+        """关闭所有线程池（程序退出时调用）"""
+        with cls._lock:
+            for pool in cls._pools.values():
+                pool.shutdown(wait=wait)
+            cls._pools.clear()
+
+
+class _LaneWindow:
+    """一次 run_lanes 调用在池中的任务：最多同时提交 limit 个"""
+
+    def __init__(self, pool, func, lanes, limit, token):
+        self._pool = pool
+        self._func = func
+        self._lanes = iter(lanes)
+        self._limit = limit
+        self._token = token
+        self.pending = {}  # future -> lane
+        self._fill()
+
+    def _fill(self):
+        while len(self.pending) < self._limit:
+            lane = next(self._lanes, _END)
+            if lane is _END:
+                return
+            future = self._pool.submit(LaneExecutor._call, self._func, lane, self._token)
+            self.pending[future] = lane
+
+    def wait(self, timeout=None):
+        """等待至少一个任务完成（最多 timeout 秒），返回 [(lane, result)]
+
+        token 被取消时取消尚未开始的任务并返回 None。
+        """
+        done, _ = wait(self.pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if self._token is not None and self._token.cancelled:
+            self.cancel()
+            return None
+        results = [(self.pending.pop(future), future.result()) for future in done]
+        self._fill()
+        return results
+
+    def cancel(self):
+        for future in self.pending:
+            future.cancel()
+        self.pending.clear()
+
+
+_END = object()
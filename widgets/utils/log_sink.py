@@ -0,0 +1,108 @@
+from collections import deque
+import logging
+import logging.handlers
+
+from PySide6.QtCore import QObject, QTimer, Slot
+
+
+class LogSink(QObject):
+    """有界、批量刷新的日志输出
+
+    write() 可以在任意线程调用，只把消息放进缓冲队列；GUI 线程按固定间隔
+    把队列中的消息一次性追加到 QPlainTextEdit。文档最多保留 max_block_count
+    行，更早的行被丢弃，或在指定 spill_path 时写入按大小轮转的日志文件。
+
+    不再使用时调用 close()：写出缓冲中的消息并关闭日志文件。
+    """
+    FLUSH_INTERVAL_MS = 50
+    MAX_BLOCK_COUNT = 5000
+    SPILL_MAX_BYTES = 10 * 1024 * 1024
+    SPILL_BACKUP_COUNT = 3
+
+    def __init__(self, text_edit, flush_interval_ms=None, max_block_count=None,
+                 spill_path=None, spill_max_bytes=None, spill_backup_count=None):
+        super().__init__(text_edit)
+        self.text_edit = text_edit
+        self.max_block_count = max_block_count or self.MAX_BLOCK_COUNT
+        self.text_edit.setMaximumBlockCount(self.max_block_count)
+
+        # deque 的 append/popleft 是线程安全的，写入方无需加锁
+        self._pending = deque()
+        # 文档中当前保留的行，用于确定被挤出文档的旧行
+        self._retained = deque()
+
+        self._spill = None
+        self._spill_handler = None
+        if spill_path:
+            self._spill = logging.getLogger(f'{__name__}.spill.{id(self)}')
+            self._spill.propagate = False
+            self._spill.setLevel(logging.INFO)
+            handler = logging.handlers.RotatingFileHandler(
+                spill_path,
+                maxBytes=spill_max_bytes or self.SPILL_MAX_BYTES,
+                backupCount=spill_backup_count or self.SPILL_BACKUP_COUNT,
+                encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self._spill.addHandler(handler)
+            self._spill_handler = handler
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(flush_interval_ms or self.FLUSH_INTERVAL_MS)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    @Slot(str)
+    def write(self, message):
+        """追加一条日志，可在任意线程调用"""
+        self._pending.append(message)
+
+    @Slot()
+    def flush(self):
+        """把缓冲的消息一次性写入控件（GUI 线程）"""
+        if not self._pending:
+            return
+
+        lines = []
+        for _ in range(len(self._pending)):
+            lines.extend(str(self._pending.popleft()).split('\n'))
+
+        # 一次刷新的行数超过上限时，只有最后 max_block_count 行需要进入文档
+        overflow = len(lines) - self.max_block_count
+        if overflow > 0:
+            self._spill_lines(lines[:overflow])
+            lines = lines[overflow:]
+
+        self._retained.extend(lines)
+        evicted = len(self._retained) - self.max_block_count
+        if evicted > 0:
+            self._spill_lines([self._retained.popleft() for _ in range(evicted)])
+
+        scroll_bar = self.text_edit.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+        self.text_edit.appendPlainText('\n'.join(lines))
+        # 只有原本停在底部时才跟随滚动，避免打断用户翻看历史
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def _spill_lines(self, lines):
+        if self._spill is None:
+            return
+        for line in lines:
+            self._spill.info(line)
+
+    @Slot()
+    def close(self):
+        """停止定时刷新，写出剩余消息并关闭日志文件（可重复调用）"""
+        self._timer.stop()
+        self.flush()
+        if self._spill_handler is not None:
+            self._spill.removeHandler(self._spill_handler)
+            self._spill_handler.close()
+            self._spill_handler = None
+            self._spill = None
+
+    @Slot()
+    def clear(self):
+        self._pending.clear()
+        self._retained.clear()
+        self.text_edit.clear()
@@ -0,0 +1,151 @@
+import json
+from pathlib import Path
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+SCHEMA_DIR = Path(__file__).resolve().parent.parent.parent / 'schemas'
+
+FIELD_TYPES = {'int': int, 'float': float, 'str': str}
+
+
+class FieldSpec:
+    """寄存器表中的一个属性
+
+    key     设备接口返回/写入的属性名
+    type    int / float / str，编辑后的文本按此类型转换
+    width   列宽（像素），None 表示按表头文字计算
+    access  'ro' 或 'rw'
+    sides   适用的 side 列表，None 表示所有 side
+    range   [min, max]，可写属性的取值范围，None 表示不限制
+    label   表头文字，默认为 key
+    """
+
+    def __init__(self, key, type='int', width=None, access='ro', sides=None,
+                 range=None, label=None):
+        if type not in FIELD_TYPES:
+            raise ValueError(f"field {key}: unknown type {type!r}")
+        if access not in ('ro', 'rw'):
+            raise ValueError(f"field {key}: access must be 'ro' or 'rw'")
+        self.key = key
+        self.type = type
+        self.width = width
+        self.access = access
+        self.sides = list(sides) if sides else None
+        self.range = tuple(range) if range else None
+        self.label = label or key
+
+    @property
+    def editable(self):
+        return self.access == 'rw'
+
+    def applies_to(self, side):
+        return self.sides is None or side in self.sides
+
+    def convert(self, text):
+        """把编辑后的文本转换为属性值，类型或范围不符时抛出 ValueError"""
+        value = FIELD_TYPES[self.type](text)
+        if self.range is not None and not self.range[0] <= value <= self.range[1]:
+            raise ValueError(f"{self.key}: {value} out of range {list(self.range)}")
+        return value
+
+
+class ColumnLayout:
+    """编译后的列布局：第 0 列为 lane，最后一列为操作列，中间为属性列
+
+    所有按列的信息都预先算好，更新表格时只做列表/字典查找。
+    """
+    LANE_WIDTH = 50
+    OPERATION_WIDTH = 150
+
+    def __init__(self, fields):
+        self.fields = [None] + list(fields) + [None]
+        self.headers = [''] + [field.label for field in fields] + ['Operation']
+        # 每列对应的数据 key，lane 列与操作列为 None
+        self.keys = [field.key if field else None for field in self.fields]
+        self.editable = [bool(field and field.editable) for field in self.fields]
+        self.column_of = {field.key: col for col, field in enumerate(self.fields) if field}
+        self.widths = {0: self.LANE_WIDTH, len(self.fields) - 1: self.OPERATION_WIDTH}
+        self.widths.update({col: field.width for col, field in enumerate(self.fields)
+                            if field and field.width})
+
+    def __len__(self):
+        return len(self.fields)
+
+    @property
+    def operation_column(self):
+        return len(self.fields) - 1
+
+    # 旧列定义中 side 后缀与对应的 side
+    LEGACY_SIDES = {'.hs': 'Host Side', '.ls': 'Line Side'}
+
+    @classmethod
+    def from_columns(cls, columns, side=None):
+        """兼容旧的列定义：["", "key.rw", "key.hs", "key.ls.rw", ..., "Operation"]
+
+        .rw 表示可写，.hs/.ls 表示只适用于 Host Side/Line Side；side 为 None
+        时不按 side 筛选。
+        """
+        fields = []
+        for item in columns[1:-1]:
+            sides = [name for suffix, name in cls.LEGACY_SIDES.items() if suffix in item]
+            for suffix in cls.LEGACY_SIDES:
+                item = item.replace(suffix, '')
+            field = FieldSpec(item.removesuffix('.rw'),
+                              access='rw' if item.endswith('.rw') else 'ro', sides=sides)
+            if side is None or field.applies_to(side):
+                fields.append(field)
+        layout = cls(fields)
+        layout.headers[0], layout.headers[-1] = columns[0], columns[-1]
+        return layout
+
+
+class PageSchema:
+    """一个寄存器页面的声明
+
+    dev_op/dev_op_args 对应 BaseFrame.DEV_OP/DEV_OP_ARGS，lane_count 对应
+    LANE_COUNT。每个 side 的列布局只编译一次。
+    """
+
+    def __init__(self, data, source=None):
+        self.source = source
+        self.title = data.get('title')
+        self.dev_op = data['dev_op']
+        self.dev_op_args = tuple(data.get('dev_op_args', ()))
+        self.lane_count = data.get('lane_count', 8)
+        self.sides = data.get('sides')
+        self.fields = [FieldSpec(**field) for field in data['fields']]
+        self._layouts = {}
+
+    def layout(self, side):
+        layout = self._layouts.get(side)
+        if layout is None:
+            layout = self._layouts[side] = ColumnLayout(
+                [field for field in self.fields if field.applies_to(side)])
+        return layout
+
+
+_schemas = {}
+
+
+def load_schema(path):
+    """加载 JSON/YAML 页面声明（相对路径相对于 schemas 目录），同一文件只解析一次
+
+    YAML 需要可选依赖 PyYAML，内置页面均为 JSON。
+    """
+    path = Path(path)
+    if not path.is_absolute():
+        path = SCHEMA_DIR / path
+    schema = _schemas.get(path)
+    if schema is None:
+        with open(path, encoding='utf-8') as f:
+            if path.suffix in ('.yaml', '.yml'):
+                if yaml is None:
+                    raise RuntimeError(f"PyYAML is required to load {path}")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        schema = _schemas[path] = PageSchema(data, path)
+    return schema